@@ -1,22 +1,118 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 from streamlit_option_menu import option_menu
 from numerize.numerize import numerize
 from models.country import Country
+from utils.dataset_store import DatasetStore, delete_row, upsert_row
+from utils.refresher import BackgroundRefresher
+from utils.resilience import ApiHealth, CircuitBreaker
+from utils.coalescing import Hedger, SingleFlight
+from utils.interpolation import PopulationInterpolator
+from utils.table import paged_dataframe
+from utils.export import export_button
+from utils.memory import CacheMemory, session_memory
+from utils.projection import ProjectionEngine
+from utils.paging import QueryPager, aggregation_to_pipeline, find_to_pipeline
+from utils.derived import DerivedMetrics
+from utils.search import CountryIndex
 import requests
 
 
 #####################################################################################################################
 
-# Definition de l'URL de l'API
-api_url = "https://josh-mongodb-api.onrender.com"
+# Definition de l'URL de l'API (la variable d'environnement API_URL permet d'en utiliser une autre, par exemple en test)
+api_url = os.environ.get("API_URL", "https://josh-mongodb-api.onrender.com")
+
+# Délais (en secondes) des appels à l'API : le préchauffage tolère le réveil de l'hébergement render.com
+api_timeout = 20
+api_warmup_timeout = 120
+
+# Requêtes couvertes sur les endpoints de lecture : un second appel est envoyé quand le premier
+# dépasse le percentile de latence api_hedging_percentile
+api_hedging = True
+api_hedging_percentile = 95
+
+# Budgets mémoire (en octets) : résultats gardés par chaque session et caches partagés du processus
+session_memory_budget = int(os.environ.get("SESSION_MEMORY_BUDGET_MB", 200)) * 2**20
+cache_memory_budget = int(os.environ.get("CACHE_MEMORY_BUDGET_MB", 500)) * 2**20
+
+# Nombre de documents chargés par page pour les requêtes personnalisées find et d'agrégation
+query_page_size = 500
+
+# Délai (en secondes) entre deux rafraîchissements en arrière-plan des jeux de données
+refresh_interval = 600
 
 
 
 #####################################################################################################################
 ######################################### DEFINITION DES ENDPOINT DE L'API ##########################################
 
+# État de santé de l'API partagé par tout le processus, avec préchauffage asynchrone au démarrage
+@st.cache_resource
+def get_api_health():
+    # Sans les lectures de la collection, aucune page ne peut afficher de données fraîches
+    health = ApiHealth(core_endpoints=("countries_info", "countries_pop"))
+    return health.warm_up(lambda: requests.get(api_url, timeout=api_warmup_timeout).status_code < 500)
+
+# Regroupement des appels identiques simultanés, partagé par tout le processus
+@st.cache_resource
+def get_single_flight():
+    return SingleFlight()
+
+# Requêtes couvertes sur les endpoints de lecture, partagées par tout le processus
+@st.cache_resource
+def get_hedger():
+    return Hedger(enabled=api_hedging, percentile=api_hedging_percentile)
+
+# Appel à l'API protégé par le disjoncteur de l'endpoint
+def call_api(method: str, endpoint: str, url: str, **kwargs):
+    """
+    Envoie une requête à l'API en passant par le disjoncteur de l'endpoint.
+
+    Parameters:
+    - method (str): La méthode HTTP (get, post, put, delete).
+    - endpoint (str): Le nom de l'endpoint, utilisé pour choisir le disjoncteur.
+    - url (str): L'URL complète de la requête.
+
+    Returns:
+    Response: La réponse de l'API, ou None si le disjoncteur est ouvert ou si l'API est injoignable.
+    """
+    health = get_api_health()
+    breaker = health.breaker(endpoint)
+    if not breaker.allow_request():
+        print(f"API indisponible ({endpoint}), appel ignoré.")
+        return None
+    def send():
+        return requests.request(method, url, timeout=api_timeout, **kwargs)
+
+    # Le disjoncteur est mis à jour une fois par appel réel, pas une fois par appelant regroupé
+    def attempt():
+        try:
+            response = get_hedger().call(endpoint, send) if method == "get" else send()
+        except requests.RequestException:
+            breaker.record_failure()
+            raise
+        # Seules les erreurs serveur comptent comme des pannes (un 404 est une réponse valide)
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+            health.mark_up()
+        return response
+
+    try:
+        if method == "get":
+            # Les lectures identiques simultanées partagent un seul appel, couvert si trop lent
+            return get_single_flight().do(url, attempt)
+        return attempt()
+    except requests.RequestException as e:
+        print(f"Erreur lors de l'appel à l'API ({endpoint}) : {e}")
+        return None
+
 # L'endpoint pour l'insertion d'un pays à travers l'API
 def insert_country(country: Country):
     """
@@ -29,8 +125,8 @@ def insert_country(country: Country):
     dict: Un dictionnaire contenant un message de confirmation et les données insérées.
     """
     country_dict = dict(country)
-    response = requests.post(f"{api_url}/insert_country/", json=country_dict)
-    if response.status_code == 200:
+    response = call_api("post", "insert_country", f"{api_url}/insert_country/", json=country_dict)
+    if response is not None and response.status_code == 200:
         return response.json()
     else:
         print("Error inserting data.")
@@ -49,8 +145,8 @@ def update_country(id: str, country: Country):
     dict: Un dictionnaire contenant un message de confirmation et les données mises à jour.
     """
     country_dict = dict(country)
-    response = requests.put(f"{api_url}/update_country/{id}", json=country_dict)
-    if response.status_code == 200:
+    response = call_api("put", "update_country", f"{api_url}/update_country/{id}", json=country_dict)
+    if response is not None and response.status_code == 200:
         return response.json()
     else:
         print("Erreur lors de la mise à jour des données.")
@@ -67,14 +163,32 @@ def delete_country(id: str):
     Returns:
     dict: Un dictionnaire contenant un message de confirmation et les données supprimées.
     """
-    response = requests.delete(f"{api_url}/delete_country/{id}")
-    if response.status_code == 200:
+    response = call_api("delete", "delete_country", f"{api_url}/delete_country/{id}")
+    if response is not None and response.status_code == 200:
         return response.json()
     else:
         print("Erreur lors de la suppression des données.")
         return None
 
 # Definition de l'endpoint pour recuperer toutes les informations de tous les pays
+def convert_country_dtypes(df):
+    """
+    Convertit en nombres décimaux les colonnes numériques reçues de l'API.
+
+    Parameters:
+    - df (DataFrame): Les données des pays telles que renvoyées par l'API.
+
+    Returns:
+    DataFrame: Le même DataFrame, colonnes converties.
+    """
+    colonnes_a_convertir = ["area", "landAreaKm", "netChange", "growthRate", "worldPercentage", "density"]
+    for colonne in colonnes_a_convertir:
+        # si df[colonne] est non vide
+        if not df[colonne].isnull().all():
+            df[colonne] = df[colonne].astype(float) # on applique la fonction numerize à la colonne pour convertir les valeurs en chiffres 
+    return df
+
+
 def get_countries():
     """
     Récupère toutes les informations des pays depuis la collection MongoDB à travers l'API et les renvoie au format d'un dataframe.
@@ -82,15 +196,9 @@ def get_countries():
     Returns:
     DataFrame: Un objet DataFrame contenant les données des pays.
     """
-    response = requests.get(f"{api_url}/countries_info/")
-    if response.status_code == 200:
-        df = pd.DataFrame(response.json())
-        colonnes_a_convertir = ["area", "landAreaKm", "netChange", "growthRate", "worldPercentage", "density"]
-        for colonne in colonnes_a_convertir:
-            # si df[colonne] est non vide
-            if not df[colonne].isnull().all():
-                df[colonne] = df[colonne].astype(float) # on applique la fonction numerize à la colonne pour convertir les valeurs en chiffres 
-        return df
+    response = call_api("get", "countries_info", f"{api_url}/countries_info/")
+    if response is not None and response.status_code == 200:
+        return convert_country_dtypes(pd.DataFrame(response.json()))
     else:
         print("Erreur lors de la récupération des données.")
         return None
@@ -108,8 +216,8 @@ def get_countries_density_between(min_density: float, max_density: float):
     Returns:
     DataFrame: Un objet DataFrame contenant les noms des pays et leurs densités comprises entre deux valeurs.
     """
-    response = requests.get(f"{api_url}/countries_density/{min_density}/{max_density}")
-    if response.status_code == 200:
+    response = call_api("get", "countries_density", f"{api_url}/countries_density/{min_density}/{max_density}")
+    if response is not None and response.status_code == 200:
         df = pd.DataFrame(response.json())
         return df
     else:
@@ -124,8 +232,8 @@ def get_most_populated_country(year: int):
     Returns:
     DataFrame: Un objet DataFrame contenant le pays le plus peuplé.
     """
-    response = requests.get(f"{api_url}/country_most_populated/{year}")
-    if response.status_code == 200:
+    response = call_api("get", "country_most_populated", f"{api_url}/country_most_populated/{year}")
+    if response is not None and response.status_code == 200:
         df = pd.DataFrame(response.json())
         return df
     else:
@@ -140,8 +248,8 @@ def get_least_populated_country(year: int):
     Returns:
     DataFrame: Un objet DataFrame contenant le pays le moins peuplé.
     """
-    response = requests.get(f"{api_url}/country_least_populated/{year}")
-    if response.status_code == 200:
+    response = call_api("get", "country_least_populated", f"{api_url}/country_least_populated/{year}")
+    if response is not None and response.status_code == 200:
         df = pd.DataFrame(response.json())
         return df
     else:
@@ -157,8 +265,8 @@ def get_countries_pop():
     Returns:
     DataFrame: Un objet DataFrame contenant les noms des pays et leurs populations de 1980 à 2050.
     """
-    response = requests.get(f"{api_url}/countries_pop/")
-    if response.status_code == 200:
+    response = call_api("get", "countries_pop", f"{api_url}/countries_pop/")
+    if response is not None and response.status_code == 200:
         df = pd.DataFrame(response.json())
         return df
     else:
@@ -176,8 +284,8 @@ def get_country_by_name(country_name: str):
     Returns:
     DataFrame: Un objet DataFrame contenant les informations du pays.
     """
-    response = requests.get(f"{api_url}/country/{country_name}")
-    if response.status_code == 200:
+    response = call_api("get", "country", f"{api_url}/country/{country_name}")
+    if response is not None and response.status_code == 200:
         df = pd.DataFrame(response.json())
         return df
     else:
@@ -192,8 +300,8 @@ def get_world_pop_avg():
     Returns:
     DataFrame: Un objet DataFrame contenant la moyenne de la population mondiale par année.
     """
-    response = requests.get(f"{api_url}/average_pop/")
-    if response.status_code == 200:
+    response = call_api("get", "average_pop", f"{api_url}/average_pop/")
+    if response is not None and response.status_code == 200:
         df = pd.DataFrame(response.json())
         return df
     else:
@@ -212,8 +320,8 @@ def get_countries_area_between(min_area: float, max_area: float):
     Returns:
     DataFrame: Un objet DataFrame contenant les noms des pays et leurs superficies comprises entre deux valeurs.
     """
-    response = requests.get(f"{api_url}/countries_areas_sup1_sup2/{min_area}/{max_area}")
-    if response.status_code == 200:
+    response = call_api("get", "countries_areas_sup1_sup2", f"{api_url}/countries_areas_sup1_sup2/{min_area}/{max_area}")
+    if response is not None and response.status_code == 200:
         df = pd.DataFrame(response.json())
         return df
     else:
@@ -231,8 +339,8 @@ def get_custom_aggregation(query: str):
     Returns:
     DataFrame: Un objet DataFrame contenant le résultat de la requête d'agrégation.
     """
-    response = requests.get(f"{api_url}/custom_aggregation/{query}")
-    if response.status_code == 200:
+    response = call_api("get", "custom_aggregation", f"{api_url}/custom_aggregation/{query}")
+    if response is not None and response.status_code == 200:
         df = pd.DataFrame(response.json())
         return df
     else:
@@ -250,8 +358,8 @@ def get_custom_find(query: str):
     Returns:
     DataFrame: Un objet DataFrame contenant le résultat de la requête find.
     """
-    response = requests.get(f"{api_url}/custom_find/{query}")
-    if response.status_code == 200:
+    response = call_api("get", "custom_find", f"{api_url}/custom_find/{query}")
+    if response is not None and response.status_code == 200:
         df = pd.DataFrame(response.json())
         return df
     else:
@@ -269,8 +377,8 @@ def get_custom_distinct(query: str):
     Returns:
     DataFrame: Un objet DataFrame contenant le résultat de la requête distinct.
     """
-    response = requests.get(f"{api_url}/custom_distinct/{query}")
-    if response.status_code == 200:
+    response = call_api("get", "custom_distinct", f"{api_url}/custom_distinct/{query}")
+    if response is not None and response.status_code == 200:
         df = pd.DataFrame(response.json())
         return df
     else:
@@ -285,8 +393,8 @@ def get_countries_pop_sup_avg(year: int):
     Returns:
     DataFrame: Un objet DataFrame contenant le nombre de pays qui ont une population supérieure à la moyenne mondiale par année et la moyenne de la population.
     """
-    response = requests.get(f"{api_url}/nb_countries_supavg/{year}")
-    if response.status_code == 200:
+    response = call_api("get", "nb_countries_supavg", f"{api_url}/nb_countries_supavg/{year}")
+    if response is not None and response.status_code == 200:
         #df = pd.DataFrame()
         return response.json()
     else:
@@ -301,8 +409,8 @@ def get_countries_pop_inf_avg(year: int):
     Returns:
     DataFrame: Un objet DataFrame contenant le nombre de pays qui ont une population inférieure à la moyenne mondiale par année et la moyenne de la population.
     """
-    response = requests.get(f"{api_url}/nb_countries_infavg/{year}")
-    if response.status_code == 200:
+    response = call_api("get", "nb_countries_infavg", f"{api_url}/nb_countries_infavg/{year}")
+    if response is not None and response.status_code == 200:
         
         return response.json()
     else:
@@ -312,49 +420,254 @@ def get_countries_pop_inf_avg(year: int):
 #####################################################################################################################
 ############################################ CONSTRUCTION DU DASHBOARD ##############################################
 
+# Stockage des jeux de données partagé par toutes les sessions du processus
+@st.cache_resource
+def get_dataset_store():
+    return DatasetStore()
+
+# Thread de rafraîchissement des jeux de données, démarré une seule fois par processus
+@st.cache_resource
+def get_refresher():
+    refresher = BackgroundRefresher(
+        get_dataset_store(),
+        {"countries": get_countries, "countries_pop": get_countries_pop},
+        interval=refresh_interval,
+    )
+    return refresher.start()
+
 # Fonction pour recupéerer tous les dataframes
 def get_all_kinde_of_df():
-    df_all = get_countries()
-    df_countries_pop = get_countries_pop()
+    # Préchauffage de l'API au démarrage du processus
+    get_api_health()
+    # Aucune session n'attend l'API : on sert la version courante, rafraîchie en arrière-plan
+    get_refresher()
+    # Chaque session reçoit une vue en lecture seule de l'unique exemplaire partagé
+    store = get_dataset_store()
+    _, df_all = store.snapshot("countries")
+    _, df_countries_pop = store.snapshot("countries_pop")
 
     return df_all, df_countries_pop
 
+# Matrice des populations annuelles, calculée une fois par version du jeu de données
+@st.cache_resource(max_entries=4)
+def get_population_interpolator(version: int, method: str, _df_all):
+    interpolator = PopulationInterpolator(_df_all, method)
+    get_cache_memory().record("interpolation", (version, method), interpolator.matrix.nbytes, interpolator)
+    return interpolator
 
-def Filter(df_all):
-    st.sidebar.header("🔍  Filter by")
-    country = st.sidebar.multiselect(
-        "Select Country",
-        options=df_all["country"].unique(),
-        #default=df_all["country"].unique()[:4],
-    )
-    place = st.sidebar.multiselect(
-        "Select Place",
-        options=df_all["place"].unique(),
-        #default=df_all["place"].unique()[:4],
-    )
-    density = st.sidebar.multiselect(
-        "Select Density",
-        options=df_all["density"].unique(),
-        #default=df_all["density"].unique()[:4],
-    )
+# Index de recherche des pays, reconstruit à chaque nouvelle version du jeu de données
+@st.cache_resource(max_entries=2)
+def get_country_index(version: int, _df_all):
+    return CountryIndex(_df_all)
+
+# Application locale d'une écriture réussie (IUDC), sans recharger toute la collection
+def apply_country_write(id, country: Country = None, insert: bool = False):
+    """
+    Répercute une insertion, une mise à jour ou une suppression dans les jeux de données en cache.
+
+    Chaque jeu de données modifié reçoit une nouvelle version, ce qui invalide les caches qui en dépendent
+    (interpolation, index de recherche...). Si le pays mis à jour ou supprimé n'est pas retrouvé dans les
+    données en cache, elles sont rechargées depuis l'API plutôt que modifiées à l'aveugle.
 
-    df_selection_in_col = df_all.query(
+    Parameters:
+    - id (str): L'ID du document écrit (None si l'API ne l'a pas renvoyé lors d'une insertion).
+    - country (Country): Les nouvelles informations du pays, ou None pour une suppression.
+    - insert (bool): True pour une insertion.
+
+    Returns:
+    bool: True si l'écriture a été appliquée aux données en cache, False si un rechargement a été demandé.
+    """
+    store = get_dataset_store()
+    # Nom du pays avant l'écriture, pour les jeux de données qui n'ont pas de colonne _id
+    old_name = None
+    if not insert:
+        _, df_all = store.snapshot("countries")
+        if id and df_all is not None and "_id" in df_all.columns:
+            matches = df_all.loc[df_all["_id"] == id, "country"]
+            old_name = matches.iloc[0] if not matches.empty else None
+        if old_name is None:
+            get_refresher().refresh_now()
+            return False
+
+    def write(df):
+        key_col, key = ("_id", id) if "_id" in df.columns else ("country", old_name)
+        if country is None:
+            return delete_row(df, key_col, key)
+        return upsert_row(df, key_col, key, dict(country))
+
+    for name in ("countries", "countries_pop"):
+        store.apply(name, write)
+    return True
+
+# Récupération de l'ID du document inséré dans la réponse de l'API
+def inserted_id(response: dict):
+    for data in (response, response.get("data"), response.get("country")):
+        if isinstance(data, dict):
+            for key in ("_id", "id", "inserted_id"):
+                if data.get(key) is not None:
+                    return str(data[key])
+    return None
+
+# Colonnes dérivées (rangs, croissances, parts, centiles) et ordres de tri, calculés une fois par version du jeu de données
+@st.cache_resource(max_entries=2)
+def get_derived_metrics(version: int, _df_all):
+    derived = DerivedMetrics(_df_all)
+    get_cache_memory().record("derived", version, derived.nbytes(), derived)
+    return derived
+
+# Projection de référence (taux d'origine), calculée une fois par version du jeu de données
+@st.cache_resource(max_entries=2)
+def get_projection_engine(version: int, _df_all):
+    return ProjectionEngine(_df_all)
+
+# Mémoire occupée par les caches partagés du processus
+@st.cache_resource
+def get_cache_memory():
+    return CacheMemory()
+
+# Libération des caches dérivés quand ils dépassent leur budget (ils seront recalculés à la demande)
+def enforce_cache_budget():
+    cache_memory = get_cache_memory()
+    if cache_memory.total() > cache_memory_budget:
+        get_population_interpolator.clear()
+        get_derived_metrics.clear()
+        cache_memory.forget("interpolation")
+        cache_memory.forget("derived")
+
+# Garde un résultat dans la session en respectant son budget mémoire
+def store_result(name: str, df, linked=()):
+    # L'ordre de tri mémorisé par le tableau du résultat est libéré avec lui
+    return session_memory(session_memory_budget).store(name, df, (f"{name}_sorted",) + tuple(linked))
+
+# Garde les pages chargées d'une requête paginée : le pager et le résultat partagent les mêmes données,
+# sont libérés ensemble, et le chargement s'arrête quand le résultat ne tient plus dans le budget
+def store_paged_result(name: str, pager):
+    stored = store_result(name, pager.frame(), linked=(f"pager_{name}",))
+    if len(stored) < pager.loaded():
+        pager.truncate(stored)
+    return stored
+
+# Comptabilise la mémoire d'un graphique affiché par la session
+def track_figure(name: str, fig):
+    session_memory(session_memory_budget).track_figure(name, fig)
+
+# Panneau de débogage : mémoire de la session, des jeux de données et des caches
+def memory_debug_panel():
+    memory = session_memory(session_memory_budget)
+    with st.sidebar.expander("🧮 Memory"):
+        st.write(f"Session results: {memory.results_bytes() / 2**20:.2f} / {session_memory_budget / 2**20:.0f} MiB")
+        for name, nbytes in memory.results.items():
+            st.caption(f"{name}: {nbytes / 2**20:.2f} MiB")
+        st.write(f"Session figures: {memory.figures_bytes() / 2**20:.2f} MiB")
+        for name, usage in get_dataset_store().memory_usage().items():
+            st.caption(f"Dataset {name} (v{usage['version']}): {usage['bytes'] / 2**20:.2f} MiB")
+        for cache, nbytes in get_cache_memory().by_cache().items():
+            st.caption(f"Cache {cache}: {nbytes / 2**20:.2f} MiB")
+        st.write(f"Caches: {get_cache_memory().total() / 2**20:.2f} / {cache_memory_budget / 2**20:.0f} MiB")
+        metrics = get_hedger().metrics()
+        st.caption(
+            f"API calls: {metrics['calls']}, coalesced: {get_single_flight().coalesced}, "
+            f"hedged: {metrics['hedges_fired']} (won: {metrics['hedges_won']})"
+        )
+
+# Badge indiquant la date de la dernière mise à jour des données
+def last_updated_badge():
+    status = get_refresher().status("countries")
+    if status["last_updated"] is not None:
+        st.sidebar.caption(f"🕒 Last updated: {status['last_updated']:%Y-%m-%d %H:%M:%S}")
+    if status["last_error"] is not None:
+        st.sidebar.warning(f"Refresh failed at {status['last_error']:%H:%M:%S}, showing the last known data.")
+
+# Badge indiquant l'état de l'API
+def api_state_badge():
+    state = get_api_health().state()
+    if state == ApiHealth.UP:
+        st.sidebar.caption("🟢 API online")
+    elif state == ApiHealth.WARMING:
+        st.sidebar.caption("🟡 API waking up...")
+    else:
+        st.sidebar.error("🔴 API unavailable: degraded read-only mode.")
+
+    # Endpoints dont le disjoncteur n'est pas fermé (les autres fonctionnent normalement)
+    tripped = {endpoint: state for endpoint, state in get_api_health().breaker_states().items() if state != CircuitBreaker.CLOSED}
+    if tripped:
+        st.sidebar.caption("Circuit breakers: " + ", ".join(f"`{endpoint}` {state.replace('_', '-')}" for endpoint, state in sorted(tripped.items())))
+
+
+def filter_countries(df_all, country, place, density):
+    """
+    Renvoie les pays sélectionnés, ou ceux qui ont à la fois la place et la densité sélectionnées.
+
+    Parameters:
+    - df_all (DataFrame): Le jeu de données des pays.
+    - country (list): Les pays sélectionnés.
+    - place (list): Les places sélectionnées.
+    - density (list): Les densités sélectionnées.
+
+    Returns:
+    DataFrame: Les lignes retenues.
+    """
+    return df_all.query(
         "country == @country | (place == @place & density == @density)"
     )
 
+
+# Version courante du jeu de données des pays, lue avec ses données, et sélection du filtre
+def countries_snapshot():
+    """
+    Renvoie la version courante du jeu de données des pays, ses données et la sélection du filtre.
+
+    Un fragment relancé seul garde les arguments de la dernière exécution complète : il lit donc ici
+    la version et les données ensemble, et réapplique le filtre à ces données.
+
+    Returns:
+    tuple: (version, df_all, df_selection).
+    """
+    version, df_all = get_dataset_store().snapshot("countries")
+    country, place, density = st.session_state.get("filter_criteria", ([], [], []))
+    return version, df_all, filter_countries(df_all, country, place, density)
+
+
+def Filter(df_all):
+    st.sidebar.header("🔍  Filter by")
+    # Les filtres ne sont appliqués qu'à la validation du formulaire
+    with st.sidebar.form("filter"):
+        country = st.multiselect(
+            "Select Country",
+            options=df_all["country"].unique(),
+            #default=df_all["country"].unique()[:4],
+        )
+        place = st.multiselect(
+            "Select Place",
+            options=df_all["place"].unique(),
+            #default=df_all["place"].unique()[:4],
+        )
+        density = st.multiselect(
+            "Select Density",
+            options=df_all["density"].unique(),
+            #default=df_all["density"].unique()[:4],
+        )
+        st.form_submit_button("Apply")
+
+    # Les critères sont gardés pour que les fragments réappliquent le filtre aux données courantes
+    st.session_state.filter_criteria = (country, place, density)
+    df_selection_in_col = filter_countries(df_all, country, place, density)
+
     # compter le nombre d'éléments filtrés
     cpt = len(df_selection_in_col)
 
     return df_selection_in_col, cpt
 
 
-def graph_Collection(df_selection, nombre_elmt):
+def graph_Collection(nombre_elmt):
+    version, df_all, df_selection = countries_snapshot()
 
     # Top nombre_elmt des pays les plus peuplés
     st.subheader(f"📊 Top {nombre_elmt} most densely populated countries in 2023")
 
-    # On récupère les 10 pays les plus peuplés en 2023
-    df_top = df_selection.sort_values(by="pop2023", ascending=False).head(nombre_elmt)
+    # On récupère les pays les plus peuplés en 2023, dans l'ordre précalculé
+    derived = get_derived_metrics(version, df_all)
+    df_top = df_all.loc[derived.top_n("pop2023", nombre_elmt, within=df_selection.index)]
     # On affiche le graphique
     fig_top = px.bar(
         df_top,
@@ -374,24 +687,24 @@ def graph_Collection(df_selection, nombre_elmt):
         width=1000,
         height=400
     )
+    track_figure("fig_top", fig_top)
     st.write(fig_top)
 
+    graph_trend()
+
+# Tendance démographique, recalculée seule quand on change la méthode d'interpolation
+@st.fragment
+def graph_trend():
     # Tendance démographique pour certains pays
     st.subheader("📊 Demographic trends for some countries")
 
-    # Recuperer les pays à partir du dataframe
-    countries = df_selection["country"].unique().tolist()
-
-    # Les pays à selectionner
-    #countries = ['India', 'China', 'United States', 'United Kingdom', 'Japan', 'Australia']
-
-    years = ['pop1980', 'pop2000', 'pop2010', 'pop2023','pop2030','pop2050']  
-
-    # Créer un sous-ensemble des données pour les pays sélectionnés
-    country_data = df_selection[df_selection['country'].isin(countries)]
+    # Méthode d'interpolation entre les années connues
+    method = st.radio("Interpolation", ["linear", "monotone"], horizontal=True)
+    version, df_all, df_selection = countries_snapshot()
+    interpolator = get_population_interpolator(version, method, df_all)
 
-    # Transformer les données pour avoir les années et les populations dans un format tabulaire
-    df = country_data.melt(id_vars=['country'], value_vars=years, var_name='Year', value_name='Population')
+    # Population année par année des pays sélectionnés
+    df = interpolator.trend(df_selection.index)
 
     # Utiliser Plotly Express pour créer le graphique
     fig_tendance = px.line(
@@ -413,41 +726,81 @@ def graph_Collection(df_selection, nombre_elmt):
         height=400
     )
     # Afficher le graphique interactif avec Streamlit
+    track_figure("fig_tendance", fig_tendance)
     st.plotly_chart(fig_tendance)
     #st.write(fig_tendance)
 
-def all_Collection(df_selection, cpt):
+def all_Collection(cpt):
+    collection_workbook()
+    collection_kpis()
+
+    st.markdown("""---""")
+
+    graph_Collection(cpt)
+
+# Tableau de la collection, recalculé seul quand on change les colonnes ou la page
+@st.fragment
+def collection_workbook():
+    version, df_all, df_selection = countries_snapshot()
     with st.expander("⏰ My MongoDB's Collection WorkBook"):
+        # Ajout des colonnes dérivées (rangs, croissances, parts du total, centiles) de la sélection
+        include_derived = st.checkbox("Include derived metrics")
+        if include_derived:
+            derived = get_derived_metrics(version, df_all)
+            df_selection = df_selection.join(derived.frame.drop(columns="country"))
         showData = st.multiselect('Filter: ', df_selection.columns, default=df_selection.columns.tolist())
-        st.dataframe(df_selection[showData], use_container_width=True)
-    
-    total_population = float(df_selection["pop2023"].sum())
-    population_mode = float(df_selection["pop2023"].mode().iloc[0]) if not df_selection["pop2023"].mode().empty else 0.0
-    population_mean = float(df_selection["pop2023"].mean()) if not df_selection["pop2023"].empty else 0.0
-    population_median = float(df_selection["pop2023"].median()) if not df_selection["pop2023"].empty else 0.0
+        # Seule la page visible des colonnes choisies est envoyée au navigateur ; la sélection étant
+        # reconstruite à chaque exécution, son contenu est identifié par la version et le filtre
+        criteria = tuple(tuple(values) for values in st.session_state.get("filter_criteria", ([], [], [])))
+        paged_dataframe(df_selection, key="workbook", columns=showData, version=(version, criteria, include_derived))
+        # Export de la sélection, écrit par morceaux à partir des données en cache
+        export_button(df_selection[showData], key="workbook", file_name="countries_selection")
+
+def population_stats(population):
+    """
+    Calcule les indicateurs affichés pour une série de populations.
+
+    Returns:
+    tuple: (total, mode, moyenne, médiane), 0.0 pour une série vide.
+    """
+    mode = population.mode()
+    return (
+        float(population.sum()),
+        float(mode.iloc[0]) if not mode.empty else 0.0,
+        float(population.mean()) if not population.empty else 0.0,
+        float(population.median()) if not population.empty else 0.0,
+    )
+
+
+# Indicateurs de population, recalculés seuls quand on change l'année
+@st.fragment
+def collection_kpis():
+    version, df_all, df_selection = countries_snapshot()
+    # Année des indicateurs, interpolée entre les années connues
+    interpolator = get_population_interpolator(version, "linear", df_all)
+    year = st.slider("Year", int(interpolator.years[0]), int(interpolator.years[-1]), 2023)
+    population = interpolator.at(year).loc[df_selection.index].round()
+
+    total_population, population_mode, population_mean, population_median = population_stats(population)
 
     total1, total2, total3, total4 = st.columns(4, gap='large')
 
     with total1:
-        st.info("Total Population in 2023", icon="📌")
+        st.info(f"Total Population in {year}", icon="📌")
         st.metric(label="Total Population", value=f"{total_population:,.0f}")
     
     with total2:
-        st.info("Population Mode in 2023", icon="📌")
+        st.info(f"Population Mode in {year}", icon="📌")
         st.metric(label="Population Mode", value=f"{population_mode:,.0f}")
 
     with total3:
-        st.info("Population Mean in 2023", icon="📌")
+        st.info(f"Population Mean in {year}", icon="📌")
         st.metric(label="Population Mean", value=f"{population_mean:,.0f}")
     
     with total4:
-        st.info("Population Median in 2023", icon="📌")
+        st.info(f"Population Median in {year}", icon="📌")
         st.metric(label="Population Median", value=f"{population_median:,.0f}")
 
-    st.markdown("""---""")
-
-    graph_Collection(df_selection, cpt)
-
 # Fonction pour la page permettant d'inserer, mettre à jour et supprimer un pays dans la collection MongoDB grace à l'API declenché par des boutons
 def formulaire_country():
     country = st.text_input("Country")
@@ -500,25 +853,37 @@ def formulaire_country():
     return country
 
 
+@st.fragment
 def insert_update_delete_country(): # IUDC
     st.subheader("📝 Insert, Update and Delete a Country")
 
     # On récupère l'action à effectuer
     action = st.radio("Action", ["Insert", "Update", "Delete"])
 
+    # En mode dégradé, ou si le disjoncteur de l'endpoint d'écriture est ouvert, les écritures sont désactivées
+    health = get_api_health()
+    read_only = health.is_degraded() or not health.is_available(f"{action.lower()}_country")
+    if read_only:
+        st.warning("The API is unavailable for this action, changes are disabled until it comes back.")
+
     # Si l'action est "Insert"
     if action == "Insert":
         # On récupère les informations du pays à insérer
-        country = formulaire_country()
+        # Le formulaire n'est envoyé qu'une fois, à la validation
+        with st.form("insert_country"):
+            country = formulaire_country()
+            submitted = st.form_submit_button(action, disabled=read_only)
 
         # On récupère le bouton soumis
-        if st.button(action):
+        if submitted:
         # On insère le pays
             response = insert_country(country)
             # Si la réponse est valide
             if response is not None:
                 # On affiche un message de confirmation
                 st.success("Successfully inserted data.")
+                # On applique l'insertion aux données en cache
+                apply_country_write(inserted_id(response), country, insert=True)
                 # Créer un dataframe avec les données insérées (country)
                 df = pd.DataFrame([country.__dict__])
                 # On affiche les données insérées dans un tableau vertical
@@ -529,18 +894,23 @@ def insert_update_delete_country(): # IUDC
                 st.error("Error inserting data.")
     # Si l'action est "Update"
     elif action == "Update":
-        # On récupère l'ID du document à mettre à jour
-        id = st.text_input("ID")
-        # On récupère les informations du pays à mettre à jour
-        country = formulaire_country()
-
-        if st.button(action):
+        with st.form("update_country"):
+            # On récupère l'ID du document à mettre à jour
+            id = st.text_input("ID")
+            # On récupère les informations du pays à mettre à jour
+            country = formulaire_country()
+            submitted = st.form_submit_button(action, disabled=read_only)
+
+        if submitted:
             # On met à jour le pays
             response = update_country(id, country)
             # Si la réponse est valide
             if response is not None:
                 # On affiche un message de confirmation
                 st.success("Successfully updated data.")
+                # On applique la mise à jour aux données en cache
+                if not apply_country_write(id, country):
+                    st.info("The country was not found in the cached data, which will be reloaded from the API.")
                 df = pd.DataFrame([country.__dict__])
                 # On affiche les données insérées dans un tableau vertical
                 st.table(df.T)
@@ -549,16 +919,21 @@ def insert_update_delete_country(): # IUDC
                 st.error("Error updating data.")
     # Si l'action est "Delete"
     elif action == "Delete":
-        # On récupère l'ID du pays à supprimer
-        id = st.text_input("ID")
+        with st.form("delete_country"):
+            # On récupère l'ID du pays à supprimer
+            id = st.text_input("ID")
+            submitted = st.form_submit_button(action, disabled=read_only)
 
-        if st.button(action):
+        if submitted:
             # On supprime le pays
             response = delete_country(id)
             # Si la réponse est valide
             if response is not None:
                 # On affiche un message de confirmation
                 st.success("Successfully deleted data.")
+                # On applique la suppression aux données en cache
+                if not apply_country_write(id):
+                    st.info("The country was not found in the cached data, which will be reloaded from the API.")
                 
             else:
                 # On affiche un message d'erreur
@@ -587,17 +962,21 @@ def graph_area(df_area):
         width=1000,
         height=600
     )
+    track_figure("fig_area", fig_area)
     st.write(fig_area)
 
 # Fonction pour la page permettant de recuperer les pays et leurs superficies et de les afficher dans un tableau ainsi qu'un graphique
-def countries_area(df_area):
+@st.fragment
+def countries_area():
+    version, df_area = get_dataset_store().snapshot("countries")
     st.subheader("📝 Countries and their area")
 
     # Saisr le nombre de pays à afficher
     nombre_elmt = st.number_input("Number of countries to display", min_value=1, max_value=250, value=10)
 
-    # On récupère les nombre_elmt premiers éléments du dataframe
-    df_area_new = df_area.head(nombre_elmt)
+    # On récupère les nombre_elmt pays les plus étendus, dans l'ordre précalculé
+    derived = get_derived_metrics(version, df_area)
+    df_area_new = df_area.loc[derived.top_n("area", nombre_elmt)]
 
     # Creation d'un dataframe avec le nom du pays et sa superficie
     df_area_new = pd.DataFrame({
@@ -633,6 +1012,7 @@ def map_population(df_selection):
         width=1000,
         height=600
     )
+    track_figure("fig_map_00", fig_map_00)
     st.write(fig_map_00)
 
     fig_map_10 = px.choropleth(
@@ -654,6 +1034,7 @@ def map_population(df_selection):
         width=1000,
         height=600
     )
+    track_figure("fig_map_10", fig_map_10)
     st.write(fig_map_10)
 
     fig_map_23 = px.choropleth(
@@ -675,15 +1056,19 @@ def map_population(df_selection):
         width=1000,
         height=600
     )
+    track_figure("fig_map_23", fig_map_23)
     st.write(fig_map_23)
 
 # Fonction pour créer la page où sera affiché la map
-def map_page(df_selection):
+@st.fragment
+def map_page():
     # Bouton pour afficher les cartes
     submitted = st.button("Show Maps")
 
     # Si le bouton est soumis
     if submitted:
+        # Le fragment relancé seul lit les données courantes, pas celles de la dernière exécution complète
+        _, df_selection = get_dataset_store().snapshot("countries_pop")
         # On affiche le dataframe
         st.dataframe(df_selection, use_container_width=True)
 
@@ -692,24 +1077,53 @@ def map_page(df_selection):
 
 
 # Page pour des requêtes spécifique sur la collection MongoDB
+# Chaque section est un fragment : interagir avec l'une ne relance que celle-ci
 def specific_request():
-    # Trouver un pays par son nom
+    find_country()
+    st.markdown("""---""")
+    populated_countries()
+    st.markdown("""---""")
+    countries_area_between()
+    st.markdown("""---""")
+    countries_density_between()
+    st.markdown("""---""")
+    world_pop_average()
+    st.markdown("""---""")
+    # Selection entre inférieur ou supérieur à l'aide de sidebar
+    st.sidebar.subheader("📝 Selection between less than or greater than")
+    countries_pop_vs_average()
+
+# Trouver un pays par son nom
+@st.fragment
+def find_country():
+    # Trouver un pays par son nom (ou son code cca2/cca3), avec autocomplétion locale
+    version, df_all = get_dataset_store().snapshot("countries")
+    country_index = get_country_index(version, df_all)
     country_name = st.text_input("Country Name")
+    suggestions = country_index.suggest(country_name)
+    if suggestions:
+        country_name = st.selectbox("Suggestions", suggestions)
     btn_cn = st.button("Find Country")
     # On récupère le bouton soumis
     if btn_cn:
-        # On récupère les informations du pays
-        df_country = get_country_by_name(country_name)
+        # On recherche le pays dans les données en cache, puis auprès de l'API s'il n'y est pas
+        found = country_index.resolve(country_name)
+        df_country = df_all.loc[[found]] if found is not None else get_country_by_name(country_name)
         # Si le pays existe
         if df_country is not None:
             # On affiche un message de confirmation
             st.success("The data has been successfully recovered.")
-            # On affiche les données récupérées
-            st.dataframe(df_country)
+            # On garde les données récupérées (dans la limite du budget mémoire) pour pouvoir les parcourir page par page
+            store_result("df_country", df_country)
         else:
             # On affiche un message d'erreur
             st.error("Country not found!")
-    st.markdown("""---""")
+    if st.session_state.get("df_country") is not None:
+        paged_dataframe(st.session_state.df_country, key="df_country")
+
+# Trouver le pays le plus et le moins peuplé suivant l'année
+@st.fragment
+def populated_countries():
     # Saisr l'année (1980, 2000, 2010, 2023, 2030, 2050)
     year = st.radio("Year", [1980, 2000, 2010, 2023, 2030, 2050])
     # Trouver le pays le plus peuplé
@@ -723,11 +1137,13 @@ def specific_request():
         if df_mpc is not None:
             # On affiche un message de confirmation
             st.success("The data has been successfully recovered.")
-            # On affiche les données récupérées
-            st.dataframe(df_mpc)
+            # On garde les données récupérées (dans la limite du budget mémoire) pour pouvoir les parcourir page par page
+            store_result("df_mpc", df_mpc)
         else:
             # On affiche un message d'erreur
             st.error("Error when recovering data!")
+    if st.session_state.get("df_mpc") is not None:
+        paged_dataframe(st.session_state.df_mpc, key="df_mpc")
     st.markdown("""---""")
     # Trouver le pays le moins peuplé
     st.subheader("📝 Find the least populated country following the year")
@@ -741,19 +1157,26 @@ def specific_request():
         if df_lpc is not None:
             # On affiche un message de confirmation
             st.success("The data has been successfully recovered.")
-            # On affiche les données récupérées
-            st.dataframe(df_lpc)
+            # On garde les données récupérées (dans la limite du budget mémoire) pour pouvoir les parcourir page par page
+            store_result("df_lpc", df_lpc)
         else:
             # On affiche un message d'erreur
             st.error("Error when recovering data!")
-    st.markdown("""---""")
+    if st.session_state.get("df_lpc") is not None:
+        paged_dataframe(st.session_state.df_lpc, key="df_lpc")
+
+# Trouver les pays dont la superficie est comprise entre deux valeurs
+@st.fragment
+def countries_area_between():
     # Trouver les pays dont la superficie est comprise entre deux valeurs
     st.subheader("📝 Find countries whose area is between two values")
-    # Saisr la valeur minimale
-    min_area = st.number_input("Minimum value", min_value=10.0)
-    # Saisr la valeur maximale
-    max_area = st.number_input("Maximum value", min_value=20.0)
-    btn_ca = st.button("Shearch Countries", key="ca")
+    # Les deux bornes sont envoyées ensemble, à la validation du formulaire
+    with st.form("ca"):
+        # Saisr la valeur minimale
+        min_area = st.number_input("Minimum value", min_value=10.0)
+        # Saisr la valeur maximale
+        max_area = st.number_input("Maximum value", min_value=20.0)
+        btn_ca = st.form_submit_button("Shearch Countries", key="ca_submit")
     # On récupère le bouton soumis
     if btn_ca:
         if min_area < max_area:
@@ -763,22 +1186,29 @@ def specific_request():
             if df_ca is not None:
                 # On affiche un message de confirmation
                 st.success("The data has been successfully recovered.")
-                # On affiche les données récupérées
-                st.dataframe(df_ca)
+                # On garde les données récupérées (dans la limite du budget mémoire) pour pouvoir les parcourir page par page
+                store_result("df_ca", df_ca)
             else:
                 # On affiche un message d'erreur
                 st.error("Error when recovering data!")
         else:
             # On affiche un message d'erreur
             st.error("The minimum value must be less than the maximum value!")
-    st.markdown("""---""")
+    if st.session_state.get("df_ca") is not None:
+        paged_dataframe(st.session_state.df_ca, key="df_ca")
+
+# Trouver les pays dont la densité est comprise entre deux valeurs
+@st.fragment
+def countries_density_between():
     # Trouver les pays dont la densité est comprise entre deux valeurs
     st.subheader("📝 Find countries whose density is between two values")
-    # Saisr la valeur minimale
-    min_density = st.number_input("Minimum value", min_value=0.0)
-    # Saisr la valeur maximale
-    max_density = st.number_input("Maximum value", min_value=0.0)
-    btn_cd = st.button("Shearch Countries", key="cd")
+    # Les deux bornes sont envoyées ensemble, à la validation du formulaire
+    with st.form("cd"):
+        # Saisr la valeur minimale
+        min_density = st.number_input("Minimum value", min_value=0.0)
+        # Saisr la valeur maximale
+        max_density = st.number_input("Maximum value", min_value=0.0)
+        btn_cd = st.form_submit_button("Shearch Countries", key="cd_submit")
     # On récupère le bouton soumis
     if btn_cd:
         if min_density < max_density:
@@ -788,15 +1218,20 @@ def specific_request():
             if df_cd is not None:
                 # On affiche un message de confirmation
                 st.success("The data has been successfully recovered.")
-                # On affiche les données récupérées
-                st.dataframe(df_cd)
+                # On garde les données récupérées (dans la limite du budget mémoire) pour pouvoir les parcourir page par page
+                store_result("df_cd", df_cd)
             else:
                 # On affiche un message d'erreur
                 st.error("Error when recovering data!")
         else:
             # On affiche un message d'erreur
             st.error("The minimum value must be less than the maximum value!")
-    st.markdown("""---""")
+    if st.session_state.get("df_cd") is not None:
+        paged_dataframe(st.session_state.df_cd, key="df_cd")
+
+# Afficher la moyenne de la population mondiale
+@st.fragment
+def world_pop_average():
     # Afficher la moyenne de la population mondiale de chaque année (1980, 2000, 2010, 2023, 2030, 2050)
     st.subheader("📝 Display the average world population for each year")
     btn_ap = st.button("Shearch Average Population")
@@ -808,14 +1243,17 @@ def specific_request():
         if df_ap is not None:
             # On affiche un message de confirmation
             st.success("The data has been successfully recovered.")
-            # On affiche les données récupérées
-            st.dataframe(df_ap)
+            # On garde les données récupérées (dans la limite du budget mémoire) pour pouvoir les parcourir page par page
+            store_result("df_ap", df_ap)
         else:
             # On affiche un message d'erreur
             st.error("Error when recovering data!")
-    st.markdown("""---""")
-    # Selection entre inférieur ou supérieur à l'aide de sidebar
-    st.sidebar.subheader("📝 Selection between less than or greater than")
+    if st.session_state.get("df_ap") is not None:
+        paged_dataframe(st.session_state.df_ap, key="df_ap")
+
+# Trouver le nombre de pays dont la population est inférieure ou supérieure à la moyenne
+@st.fragment
+def countries_pop_vs_average():
     # Selection entre inférieur ou supérieur
     select = st.selectbox("", ["select", "Less than", "Greater than"])
     
@@ -865,64 +1303,151 @@ def specific_request():
                 st.error("Error when recovering data!")
 
 # Page pour des requêtes personnalisées sur la collection MongoDB
+# Chaque requête est un fragment : exécuter ou parcourir l'une ne relance que celle-ci
 def personalized_request():
+    custom_aggregation_request()
+    st.markdown("""---""")
+    custom_find_request()
+    st.markdown("""---""")
+    custom_distinct_request()
 
+# Exécuteur partagé pour précharger en arrière-plan la page suivante des requêtes personnalisées
+@st.cache_resource
+def get_prefetch_executor():
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="query-prefetch")
+
+# Lance une requête personnalisée page par page ($skip/$limit ajoutés au pipeline) et charge la première page
+def start_paged_query(name: str, pipeline: list):
+    """
+    Exécute la première page d'un pipeline d'agrégation et garde le pager dans la session.
+
+    Parameters:
+    - name (str): La clé du résultat dans st.session_state.
+    - pipeline (list): Le pipeline d'agrégation.
+
+    Returns:
+    bool: True si la première page a été récupérée, False sinon.
+    """
+    pager = QueryPager(
+        pipeline,
+        lambda p: get_custom_aggregation(json.dumps(p)),
+        page_size=query_page_size,
+        executor=get_prefetch_executor(),
+    )
+    if pager.next_page() is None:
+        return False
+    st.session_state[f"pager_{name}"] = pager
+    store_paged_result(name, pager)
+    return True
+
+# Affiche le résultat d'une requête personnalisée, avec le chargement des pages suivantes et l'export
+def query_results(name: str, file_name: str):
+    if st.session_state.get(name) is None:
+        return
+    pager = st.session_state.get(f"pager_{name}")
+    if pager is None:
+        paged_dataframe(st.session_state[name], key=name)
+        export_button(st.session_state[name], key=name, file_name=file_name)
+        return
+
+    more_col, count_col = st.columns(2)
+    if not pager.exhausted and more_col.button("Load more rows", key=f"{name}_more"):
+        if pager.next_page() is None:
+            st.error("Error when recovering data!")
+        else:
+            store_paged_result(name, pager)
+    if pager.total is None and count_col.button("Count total rows", key=f"{name}_count"):
+        pager.count()
+    total = f" of {pager.total:,}" if pager.total is not None else ""
+    st.caption(f"{pager.loaded():,}{total} rows loaded" + ("" if pager.exhausted else ", more available"))
+    if pager.truncated:
+        st.caption("No more rows can be loaded within the session memory budget.")
+
+    paged_dataframe(st.session_state[name], key=name)
+    # L'export parcourt tout le résultat, page par page, auprès de l'API, avec les champs de toutes les pages chargées
+    export_button(pager.fetch_page, key=name, file_name=file_name, columns=pager.frame().columns)
+
+# Requête personnalisée d'aggregation
+@st.fragment
+def custom_aggregation_request():
     # Pour les requêtes personnalisées d'aggregation
     st.subheader("📝 Custom aggregation request")
 
     # On récupère la requête d'aggregation avec un texte en arrière plan
-    query = st.text_area("", key="query_agg")
-
-    # On récupère le bouton soumis
-    btn_agg = st.button("Search_Agg")
+    with st.form("custom_aggregation_request"):
+        query = st.text_area("", key="query_agg")
+        # On récupère le bouton soumis
+        btn_agg = st.form_submit_button("Search_Agg")
 
     # On récupère les données
     if btn_agg:
-        # On récupère les données
-        df_ar = get_custom_aggregation(query)
+        st.session_state.pop("pager_df_ar", None)
+        pipeline = aggregation_to_pipeline(query)
+        if pipeline is not None:
+            # On ne récupère que la première page, les suivantes sont chargées à la demande
+            found = start_paged_query("df_ar", pipeline)
+        else:
+            # Requête non reconnue : on l'envoie telle quelle, en un seul appel
+            df_ar = get_custom_aggregation(query)
+            found = df_ar is not None
+            if found:
+                # On garde les données récupérées (dans la limite du budget mémoire) pour pouvoir les parcourir page par page
+                store_result("df_ar", df_ar)
         # Si les données existent
-        if df_ar is not None:
+        if found:
             # On affiche un message de confirmation
             st.success("The data has been successfully recovered.")
-            # On affiche les données récupérées
-            st.dataframe(df_ar)
         else:
             # On affiche un message d'erreur
             st.error("Error when recovering data!")
-    st.markdown("""---""")
+    query_results("df_ar", "custom_aggregation")
 
+# Requête personnalisée find
+@st.fragment
+def custom_find_request():
     # Pour les requêtes personnalisées find
     st.subheader("📝 Custom find request")
 
     # On récupère la requête find
-    query = st.text_area("", key="query_find")
-
-    # On récupère le bouton soumis
-    btn_find = st.button("Search_Find")
+    with st.form("custom_find_request"):
+        query = st.text_area("", key="query_find")
+        # On récupère le bouton soumis
+        btn_find = st.form_submit_button("Search_Find")
 
     # On récupère les données
     if btn_find:
-        # On récupère les données
-        df_fr = get_custom_find(query)
+        st.session_state.pop("pager_df_fr", None)
+        pipeline = find_to_pipeline(query)
+        if pipeline is not None:
+            # On ne récupère que la première page, les suivantes sont chargées à la demande
+            found = start_paged_query("df_fr", pipeline)
+        else:
+            # Requête non reconnue : on l'envoie telle quelle, en un seul appel
+            df_fr = get_custom_find(query)
+            found = df_fr is not None
+            if found:
+                # On garde les données récupérées (dans la limite du budget mémoire) pour pouvoir les parcourir page par page
+                store_result("df_fr", df_fr)
         # Si les données existent
-        if df_fr is not None:
+        if found:
             # On affiche un message de confirmation
             st.success("The data has been successfully recovered.")
-            # On affiche les données récupérées
-            st.dataframe(df_fr)
         else:
             # On affiche un message d'erreur
             st.error("Error when recovering data!")
-    st.markdown("""---""")
+    query_results("df_fr", "custom_find")
 
+# Requête personnalisée distinct
+@st.fragment
+def custom_distinct_request():
     # Pour les requêtes personnalisées distinct
     st.subheader("📝 Custom distinct request")
 
     # On récupère la requête distinct
-    query = st.text_area("", key="query_distinct")
-
-    # On récupère le bouton soumis
-    btn_distinct = st.button("Search_Distinct")
+    with st.form("custom_distinct_request"):
+        query = st.text_area("", key="query_distinct")
+        # On récupère le bouton soumis
+        btn_distinct = st.form_submit_button("Search_Distinct")
 
     # On récupère les données
     if btn_distinct:
@@ -932,21 +1457,101 @@ def personalized_request():
         if df_dr is not None:
             # On affiche un message de confirmation
             st.success("The data has been successfully recovered.")
-            # On affiche les données récupérées
-            st.dataframe(df_dr)
+            # On garde les données récupérées (dans la limite du budget mémoire) pour pouvoir les parcourir page par page
+            store_result("df_dr", df_dr)
         else:
             # On affiche un message d'erreur
             st.error("Error when recovering data!")
+    if st.session_state.get("df_dr") is not None:
+        paged_dataframe(st.session_state.df_dr, key="df_dr")
+        export_button(st.session_state.df_dr, key="df_dr", file_name="custom_distinct")
+
+
+# Page de projection de la population suivant des taux de croissance ajustés par l'utilisateur
+@st.fragment
+def what_if_projection():
+    # Chaque session ajuste sa propre copie de la projection de référence
+    version, df_all = get_dataset_store().snapshot("countries")
+    if st.session_state.get("projection_version") != version:
+        engine = get_projection_engine(version, df_all).copy()
+        # Nouvelle version des données : les ajustements de l'utilisateur sont repris
+        if st.session_state.get("projection") is not None:
+            engine.adopt(st.session_state.projection)
+        st.session_state.projection = engine
+        st.session_state.projection_version = version
+    engine = st.session_state.projection
+
+    # Année cible : toute la projection est recalculée en un seul calcul vectorisé
+    target_year = st.slider("Target year", engine.base_year + 1, 2100, 2050)
+    if target_year != engine.target_year:
+        engine.project(target_year)
+
+    col1, col2 = st.columns(2, gap='large')
+    with col1:
+        with st.form("projection_all"):
+            delta = st.number_input("Growth rate adjustment for all countries (percentage points)", min_value=-5.0, max_value=5.0, value=0.0, step=0.1)
+            if st.form_submit_button("Apply to all countries"):
+                engine.shift_rates(delta / 100)
+    with col2:
+        with st.form("projection_country"):
+            label = st.selectbox("Country", engine.index, format_func=lambda i: engine.countries[engine.index.get_loc(i)])
+            rate = st.number_input("Growth rate (%)", min_value=-10.0, max_value=10.0, value=0.0, step=0.1)
+            # Seule la ligne du pays et le total mondial sont recalculés
+            if st.form_submit_button("Apply to this country"):
+                engine.set_rate(label, rate / 100)
+    if st.button("Reset growth rates"):
+        engine.reset()
+
+    base_total = float(engine.base.sum())
+    total1, total2 = st.columns(2, gap='large')
+    with total1:
+        st.info(f"Projected World Population in {target_year}", icon="📌")
+        st.metric(label="Projected Population", value=f"{engine.total:,.0f}", delta=f"{engine.total - base_total:,.0f}")
+    with total2:
+        st.info(f"Population in {engine.base_year}", icon="📌")
+        st.metric(label="Population", value=f"{base_total:,.0f}")
 
+    df_projection = engine.frame()
+    projected = f"projected{target_year}"
+
+    # Top 10 des pays les plus peuplés selon la projection
+    df_top = df_projection.nlargest(10, projected)
+    fig_projection = px.bar(
+        df_top,
+        x="country",
+        y=projected,
+        color="country",
+        title=f"Top 10 most populated countries in {target_year} (projection)",
+        template="plotly_white",
+    )
+    fig_projection.update_layout(
+        xaxis_title="Pays",
+        yaxis_title="Population",
+        legend_title="Pays",
+        plot_bgcolor="rgba(0,0,0,0)",
+        xaxis=(dict(showgrid=False)),
+        width=1000,
+        height=400
+    )
+    track_figure("fig_projection", fig_projection)
+    st.write(fig_projection)
+
+    # La projection est reconstruite à chaque exécution : son contenu est identifié par ses paramètres
+    paged_dataframe(df_projection, key="projection", version=(version, engine.target_year, engine.delta, tuple(sorted(engine.overrides.items()))))
+
+# Pages du menu principal
+menu_options = ["Home", "IUDC", "Countries and their area", "Map of the population in 2000, 2010 and 2023", "Specific Requests", "Personalized Requests", "What-if Projections"]
 
 def sidebBar():
+    # Page demandée dans l'URL (?page=...), pour un lien direct vers une page
+    page = st.query_params.get("page")
     with st.sidebar:
         selected = option_menu(
             menu_title="Main Menu",
-            options=["Home", "IUDC", "Countries and their area", "Map of the population in 2000, 2010 and 2023", "Specific Requests", "Personalized Requests"],
-            icons=["house", "pencil", "globe", "map", "search", "search"],
+            options=menu_options,
+            icons=["house", "pencil", "globe", "map", "search", "search", "graph-up"],
             menu_icon="cast",
-            default_index=0
+            default_index=menu_options.index(page) if page in menu_options else 0
         )
     return selected
 
@@ -962,8 +1567,15 @@ def main():
 
     # Récupération des dataframes
     df_all, df_countries_pop = get_all_kinde_of_df()
+    api_state_badge()
+    last_updated_badge()
+    enforce_cache_budget()
 
-    
+    # Premier chargement encore en cours : on n'attend pas, l'utilisateur pourra relancer
+    if df_all is None or df_countries_pop is None:
+        st.info("The data is being loaded, please try again in a few moments.")
+        st.button("Reload")
+        st.stop()
 
     if "start_btn_clicked" not in st.session_state:
         # Initialiser la variable avec la valeur par défaut (False)
@@ -982,15 +1594,15 @@ def main():
 
         if selected == "Home":
             df_selection, cpt=Filter(df_all)
-            all_Collection(df_selection, cpt)
+            all_Collection(cpt)
         elif selected == "IUDC":
             insert_update_delete_country()
         elif selected == "Countries and their area":
             st.header("📊 Countries and their area")
-            countries_area(df_all)
+            countries_area()
         elif selected == "Map of the population in 2000, 2010 and 2023":
             st.header("🗺️ Map of the population in 2000, 2010 and 2023")
-            map_page(df_countries_pop)
+            map_page()
         elif selected == "Specific Requests":
             st.header("🖋 Specific Requests")
             specific_request()
@@ -998,6 +1610,11 @@ def main():
             st.header("🖋 Personalized Requests")
             st.markdown("""---""")
             personalized_request()
+        elif selected == "What-if Projections":
+            st.header("🔮 What-if Projections")
+            what_if_projection()
+
+        memory_debug_panel()
 
 
 if __name__ == "__main__":
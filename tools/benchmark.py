@@ -0,0 +1,238 @@
+"""
+Micro-benchmarks du chemin de données du dashboard, sur des jeux de données fictifs ayant la forme
+du modèle Country : temps d'exécution et pic de mémoire de chaque étape, comparés à des références.
+
+Aucun appel réseau n'est fait : les étapes mesurées sont les fonctions pures utilisées par les pages.
+
+Utilisation (depuis la racine du dépôt) :
+    python -m tools.benchmark                      # compare aux références, code de sortie 1 si régression
+    python -m tools.benchmark --update-baseline    # enregistre les mesures comme nouvelles références
+    python -m tools.benchmark --sizes 250 10000 --only filter_query --threshold 0.5
+
+Les références dépendent de la machine : les régénérer avec --update-baseline après un changement
+de machine ou de versions de pandas/numpy.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from pydantic import TypeAdapter
+
+from dashboard import convert_country_dtypes, filter_countries, population_stats
+from models.country import Country
+from tools.synthetic import synthetic_countries
+from utils.derived import DerivedMetrics
+from utils.interpolation import PopulationInterpolator
+
+
+# Fichier des références, à côté de ce module
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baselines.json")
+
+DEFAULT_SIZES = (250, 10_000, 100_000, 1_000_000)
+
+# En dessous de cet écart (en secondes), une différence de temps est considérée comme du bruit
+TIME_NOISE_FLOOR = 0.005
+
+# Durée minimale (en secondes) des exécutions chronométrées d'une mesure, et leur nombre maximal
+MIN_TIMED_SECONDS = 0.25
+MAX_TIMED_RUNS = 100
+
+# Idem pour le pic de mémoire (en octets)
+MEMORY_NOISE_FLOOR = 256 * 2**10
+
+# Colonnes converties par get_countries(), reçues de l'API comme des nombres JSON sans type
+_JSON_NUMERIC = ["area", "landAreaKm", "netChange", "growthRate", "worldPercentage", "density"]
+
+
+def _setup_convert(df):
+    # Le JSON mêle entiers et décimaux : les colonnes arrivent de type object
+    return df.drop(columns="_id").astype({col: object for col in _JSON_NUMERIC})
+
+
+def _setup_filter(df):
+    rows = df.iloc[np.linspace(0, len(df) - 1, 5).astype(int)]
+    return df, list(rows["country"]), list(rows["place"]), list(rows["density"])
+
+
+def _setup_stats(df):
+    return PopulationInterpolator(df), df.index
+
+
+def _run_stats(state):
+    interpolator, index = state
+    return population_stats(interpolator.at(2023).loc[index].round())
+
+
+def _setup_top_n(df):
+    return df, DerivedMetrics(df)
+
+
+def _run_top_n(state):
+    df, derived = state
+    return df.loc[derived.top_n("area", 10), ["country", "area"]]
+
+
+def _setup_validation(df):
+    return df.drop(columns="_id").to_dict("records")
+
+
+# Étapes mesurées : (nom, préparation non mesurée, étape mesurée, nombre de lignes maximal)
+BENCHMARKS = [
+    ("convert_dtypes", _setup_convert, lambda df: convert_country_dtypes(df.copy()), None),
+    ("filter_query", _setup_filter, lambda state: filter_countries(*state), None),
+    ("interpolator_build", lambda df: df, PopulationInterpolator, None),
+    ("collection_stats", _setup_stats, _run_stats, None),
+    # Le format long compte une ligne par pays et par année (71 millions pour un million de pays)
+    ("population_trend", _setup_stats, lambda state: state[0].trend(state[1]), 100_000),
+    ("derived_metrics", lambda df: df, DerivedMetrics, None),
+    ("countries_area_top_n", _setup_top_n, _run_top_n, None),
+    # Une liste de dictionnaires d'un million de pays ne tient pas raisonnablement en mémoire
+    ("country_validation", _setup_validation, TypeAdapter(list[Country]).validate_python, 100_000),
+]
+
+
+def measure(run, state, repeat: int):
+    """
+    Mesure une étape : temps médian d'au moins `repeat` exécutions (plus pour les étapes rapides,
+    jusqu'à cumuler MIN_TIMED_SECONDS), puis pic de mémoire d'une exécution suivie par tracemalloc.
+
+    Returns:
+    dict: {"seconds": float, "peak_bytes": int}.
+    """
+    run(state)  # échauffement
+    timings = []
+    while len(timings) < repeat or (sum(timings) < MIN_TIMED_SECONDS and len(timings) < MAX_TIMED_RUNS):
+        start = time.perf_counter()
+        run(state)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        run(state)
+        peak = tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return {"seconds": statistics.median(timings), "peak_bytes": max(0, peak)}
+
+
+def run_benchmarks(sizes, names=None, repeat: int = 5, log=print):
+    """
+    Exécute les étapes sélectionnées pour chaque taille de jeu de données.
+
+    Parameters:
+    - sizes (list): Les nombres de lignes des jeux de données fictifs.
+    - names (list): Les étapes à exécuter (toutes par défaut).
+    - repeat (int): Le nombre minimal d'exécutions chronométrées par mesure.
+    - log (callable): La fonction d'affichage de la progression.
+
+    Returns:
+    dict: Les mesures, au format {étape: {taille: {"seconds", "peak_bytes"}}}.
+    """
+    results = {}
+    for size in sizes:
+        df = synthetic_countries(size)
+        for name, setup, run, max_rows in BENCHMARKS:
+            if names and name not in names:
+                continue
+            if max_rows is not None and size > max_rows:
+                log(f"{name:<22} {size:>9,}  skipped (> {max_rows:,} rows)")
+                continue
+            result = measure(run, setup(df), repeat)
+            results.setdefault(name, {})[str(size)] = result
+            log(f"{name:<22} {size:>9,}  {result['seconds'] * 1000:>10.2f} ms  {result['peak_bytes'] / 2**20:>9.2f} MiB")
+    return results
+
+
+def compare(results, baselines, threshold: float, memory_threshold: float):
+    """
+    Compare les mesures aux références.
+
+    Parameters:
+    - results (dict): Les mesures de run_benchmarks.
+    - baselines (dict): Les mesures de référence, au même format.
+    - threshold (float): La hausse de temps tolérée (0.5 pour 50 %).
+    - memory_threshold (float): La hausse de pic de mémoire tolérée.
+
+    Returns:
+    list: Les régressions, une phrase par mesure dépassant son seuil.
+    """
+    regressions = []
+    for name, by_size in results.items():
+        for size, result in by_size.items():
+            base = baselines.get(name, {}).get(size)
+            if base is None:
+                continue
+            seconds, base_seconds = result["seconds"], base["seconds"]
+            if seconds > base_seconds * (1 + threshold) and seconds - base_seconds > TIME_NOISE_FLOOR:
+                regressions.append(f"{name} @ {int(size):,} rows: {base_seconds * 1000:.2f} ms -> {seconds * 1000:.2f} ms")
+            peak, base_peak = result["peak_bytes"], base["peak_bytes"]
+            if peak > base_peak * (1 + memory_threshold) and peak - base_peak > MEMORY_NOISE_FLOOR:
+                regressions.append(f"{name} @ {int(size):,} rows: {base_peak / 2**20:.2f} MiB -> {peak / 2**20:.2f} MiB peak")
+    return regressions
+
+
+def load_baselines(path: str):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get("results", {})
+
+
+def save_baselines(path: str, results):
+    # Les nouvelles mesures remplacent les anciennes, les autres références sont conservées
+    merged = load_baselines(path)
+    for name, by_size in results.items():
+        merged.setdefault(name, {}).update(by_size)
+    payload = {
+        "environment": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+        },
+        "results": merged,
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks du chemin de données du dashboard.")
+    parser.add_argument("--sizes", type=int, nargs="*", default=list(DEFAULT_SIZES), help="Nombres de lignes des jeux de données")
+    parser.add_argument("--only", nargs="*", default=None, choices=[name for name, *_ in BENCHMARKS], help="Étapes à exécuter (toutes par défaut)")
+    parser.add_argument("--repeat", type=int, default=5, help="Nombre minimal d'exécutions chronométrées par mesure")
+    # Le temps varie d'une exécution à l'autre bien plus que le pic de mémoire, d'où des seuils distincts
+    parser.add_argument("--threshold", type=float, default=0.5, help="Hausse de temps tolérée (0.5 pour 50 %%)")
+    parser.add_argument("--memory-threshold", type=float, default=0.1, help="Hausse de pic de mémoire tolérée (0.1 pour 10 %%)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Fichier des références")
+    parser.add_argument("--update-baseline", action="store_true", help="Enregistrer les mesures comme références")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.only, args.repeat)
+
+    if args.update_baseline:
+        save_baselines(args.baseline, results)
+        print(f"Baselines written to {args.baseline}")
+        return
+
+    baselines = load_baselines(args.baseline)
+    measured = sum(len(by_size) for by_size in results.values())
+    compared = sum(size in baselines.get(name, {}) for name, by_size in results.items() for size in by_size)
+    regressions = compare(results, baselines, args.threshold, args.memory_threshold)
+    print(f"Measurements: {measured}  Compared to baseline: {compared}  Regressions: {len(regressions)}")
+    for regression in regressions:
+        print(f"  {regression}")
+    if regressions:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,497 @@
+"""
+Test de charge du dashboard : N sessions simulées parcourent les pages du menu contre une API locale.
+
+L'application est lancée une seule fois avec `streamlit run`, comme en production, et chaque session
+est un client websocket qui parle le protocole du navigateur : toutes les sessions partagent donc le
+même processus, ses caches et son jeu de données, dont on suit la mémoire résidente.
+Sur chaque page, la session répète une interaction ; elle appelle l'API quand la page en propose une
+(formulaire IUDC, requêtes spécifiques et personnalisées), sinon elle modifie un widget local. Comme
+dans le navigateur, une interaction dans un fragment ne relance que ce fragment.
+
+Utilisation (depuis la racine du dépôt) :
+    python -m tools.load_test --sessions 20 --iterations 5
+"""
+import argparse
+import itertools
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlencode
+
+from tools.synthetic import synthetic_countries
+
+
+# Racine du dépôt (l'application lit ses fichiers statiques en chemins relatifs) et fichier de l'application
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_FILE = os.path.join(REPO_ROOT, "dashboard.py")
+
+
+class StandInApi:
+    """
+    API locale imitant les endpoints de l'API MongoDB, servie dans un thread, qui compte les appels reçus.
+    """
+
+    def __init__(self, n_countries: int = 250, latency: float = 0.0, port: int = 0):
+        """
+        Parameters:
+        - n_countries (int): Le nombre de pays du jeu de données fictif.
+        - latency (float): Le délai (en secondes) ajouté à chaque réponse.
+        - port (int): Le port d'écoute (0 pour un port libre choisi par le système).
+        """
+        self.df = synthetic_countries(n_countries)
+        self.latency = latency
+        self.calls = 0
+        # Les pays insérés reçoivent des _id qui suivent ceux du jeu de données fictif
+        self._ids = itertools.count(n_countries)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, name="stand-in-api", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+
+    def respond(self, method: str, path: str):
+        """
+        Renvoie le code HTTP et le corps JSON de la réponse à une requête.
+        """
+        with self._lock:
+            self.calls += 1
+        df = self.df
+        parts = [unquote(p) for p in path.strip("/").split("/")]
+        endpoint = parts[0] if parts else ""
+        if method == "POST":
+            with self._lock:
+                inserted = f"{next(self._ids):024x}"
+            return 200, {"message": "ok", "data": {"_id": inserted}}
+        if method != "GET":
+            return 200, {"message": "ok"}
+        if endpoint == "":
+            return 200, {"message": "ok"}
+        if endpoint == "countries_info":
+            return 200, df.to_dict("records")
+        if endpoint == "countries_pop":
+            return 200, df[["country", "pop2000", "pop2010", "pop2023"]].to_dict("records")
+        if endpoint == "country":
+            rows = df[df["country"] == parts[1]]
+            return (200, rows.to_dict("records")) if len(rows) else (404, {"detail": "Country not found"})
+        if endpoint in ("country_most_populated", "country_least_populated"):
+            col = f"pop{parts[1]}"
+            row = df.loc[[df[col].idxmax() if endpoint == "country_most_populated" else df[col].idxmin()]]
+            return 200, row[["country", col]].to_dict("records")
+        if endpoint in ("countries_density", "countries_areas_sup1_sup2"):
+            col = "density" if endpoint == "countries_density" else "area"
+            rows = df[df[col].between(float(parts[1]), float(parts[2]))]
+            return 200, rows[["country", col]].to_dict("records")
+        if endpoint == "average_pop":
+            return 200, [{f"avg_pop{y}": float(df[f"pop{y}"].mean()) for y in (1980, 2000, 2010, 2023, 2030, 2050)}]
+        if endpoint in ("nb_countries_supavg", "nb_countries_infavg"):
+            col = f"pop{parts[1]}"
+            mean = df[col].mean()
+            count = (df[col] > mean).sum() if endpoint == "nb_countries_supavg" else (df[col] < mean).sum()
+            return 200, {"count": int(count), "average": float(mean)}
+        if endpoint in ("custom_aggregation", "custom_find", "custom_distinct"):
+            return 200, df.head(50).to_dict("records")
+        return 404, {"detail": "Not found"}
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self):
+                if api.latency:
+                    time.sleep(api.latency)
+                status, body = api.respond(self.command, self.path)
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _reply
+
+        return Handler
+
+
+def rss_bytes(pid: int):
+    """
+    Renvoie la mémoire résidente actuelle d'un processus (0 si /proc n'est pas disponible).
+    """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(api_url: str, port: int, timeout: float):
+    """
+    Lance l'application avec `streamlit run` dans un processus séparé et attend qu'elle réponde.
+
+    Returns:
+    Popen: Le processus du serveur Streamlit.
+    """
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", APP_FILE,
+            "--server.headless", "true",
+            "--server.address", "127.0.0.1",
+            "--server.port", str(port),
+            "--browser.gatherUsageStats", "false",
+        ],
+        cwd=REPO_ROOT,
+        env={**os.environ, "API_URL": api_url},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"streamlit run exited with code {server.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("streamlit run did not answer in time")
+
+
+class Session:
+    """
+    Session simulée : un client websocket qui envoie les messages du navigateur (relance du script
+    avec l'état des widgets) et lit les éléments renvoyés par le serveur.
+    """
+
+    def __init__(self, port: int, page: str, timeout: float):
+        """
+        Parameters:
+        - port (int): Le port du serveur Streamlit.
+        - page (str): La page ouverte (paramètre ?page= de l'URL).
+        - timeout (float): Le délai maximal d'une exécution.
+        """
+        # Le client websocket n'est nécessaire que pour le test de charge
+        from websockets.sync.client import connect
+
+        self.query_string = urlencode({"page": page})
+        self.timeout = timeout
+        self.elements = {}
+        self.values = {}
+        self._connection = connect(
+            f"ws://127.0.0.1:{port}/_stcore/stream",
+            subprotocols=["streamlit"],
+            max_size=None,
+            proxy=None,
+            open_timeout=timeout,
+        )
+
+    def __enter__(self):
+        self._ws = self._connection.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._connection.__exit__(*exc_info)
+
+    def find(self, kind: str, label: str = None, key: str = None):
+        """
+        Renvoie le premier élément affiché d'un type donné, choisi par son libellé ou par sa clé.
+
+        Returns:
+        tuple: (proto de l'élément, identifiant de son fragment ou "").
+        """
+        for element_kind, proto, fragment_id in self.elements.values():
+            if element_kind != kind:
+                continue
+            if label is not None and proto.label != label:
+                continue
+            # L'identifiant d'un widget créé avec key= se termine par cette clé
+            if key is not None and not proto.id.endswith(f"-{key}"):
+                continue
+            return proto, fragment_id
+        raise LookupError(f"{kind} {label or key!r} not found")
+
+    def run(self, triggers=(), fragment_id: str = ""):
+        """
+        Relance le script (ou seulement un fragment) avec l'état courant des widgets affichés et les
+        boutons cliqués, et lit les messages jusqu'à la fin de l'exécution.
+
+        Parameters:
+        - triggers (list): Les identifiants des boutons cliqués.
+        - fragment_id (str): Le fragment à relancer seul ("" pour une exécution complète).
+
+        Returns:
+        tuple: (exécution terminée sans erreur, liste des erreurs affichées).
+        """
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        shown = {proto.id for kind, proto, _ in self.elements.values() if hasattr(proto, "id")}
+        widgets = [state for widget_id, state in self.values.items() if widget_id in shown]
+        widgets += [WidgetState(id=widget_id, trigger_value=True) for widget_id in triggers]
+
+        msg = BackMsg()
+        msg.rerun_script.query_string = self.query_string
+        msg.rerun_script.widget_states.widgets.extend(widgets)
+        msg.rerun_script.fragment_id = fragment_id
+        if not fragment_id:
+            self.elements = {}
+        self._ws.send(msg.SerializeToString())
+
+        errors, memory_panel, status = [], False, None
+        deadline = time.monotonic() + self.timeout
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(self._ws.recv(timeout=max(0.0, deadline - time.monotonic())))
+            kind = forward.WhichOneof("type")
+            if kind == "delta":
+                delta = forward.delta
+                if delta.WhichOneof("type") == "new_element":
+                    element_kind = delta.new_element.WhichOneof("type")
+                    proto = getattr(delta.new_element, element_kind)
+                    self.elements[tuple(forward.metadata.delta_path)] = (element_kind, proto, delta.fragment_id)
+                    if element_kind == "exception":
+                        errors.append(proto.message)
+                elif delta.WhichOneof("type") == "add_block" and delta.add_block.expandable.label == "🧮 Memory":
+                    memory_panel = True
+            elif kind == "script_finished":
+                status = forward.script_finished
+                # Le script relancé par st.rerun envoie ensuite sa propre fin d'exécution
+                if status != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    break
+
+        # Une exécution complète va jusqu'au panneau mémoire, affiché en dernier
+        ok = status in (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY)
+        return ok and not errors and (bool(fragment_id) or memory_panel), errors
+
+    def interact(self, triggers=(), values=()):
+        """
+        Modifie des widgets et clique des boutons, comme dans le navigateur : si tous sont dans le même
+        fragment, seul ce fragment est relancé.
+
+        Parameters:
+        - triggers (list): Les boutons cliqués, au format (libellé ou None, clé ou None).
+        - values (list): Les widgets modifiés, au format (type, libellé ou None, clé ou None, WidgetState).
+        """
+        fragments, ids = set(), []
+        for label, key in triggers:
+            proto, fragment_id = self.find("button", label, key)
+            ids.append(proto.id)
+            fragments.add(fragment_id)
+        for kind, label, key, state in values:
+            proto, fragment_id = self.find(kind, label, key)
+            state.id = proto.id
+            self.values[proto.id] = state
+            fragments.add(fragment_id)
+        return self.run(ids, fragments.pop() if len(fragments) == 1 else "")
+
+    def start(self):
+        """
+        Ouvre la page, puis clique sur "Start" pour afficher l'application.
+        """
+        ok, errors = self.run()
+        if any(kind == "button" and proto.label == "Start" for kind, proto, _ in self.elements.values()):
+            ok, errors = self.interact(triggers=[("Start", None)])
+        return ok, errors
+
+    def loading(self):
+        return any(kind == "alert" and "being loaded" in proto.body for kind, proto, _ in self.elements.values())
+
+
+def _value(**field):
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    state = WidgetState()
+    for name, value in field.items():
+        if name == "double_array_value":
+            state.double_array_value.data[:] = value
+        else:
+            setattr(state, name, value)
+    return state
+
+
+def _find(session, i):
+    query = json.dumps({"country": f"Country {i}"})
+    return session.interact(
+        triggers=[("Search_Find", None)],
+        values=[("text_area", None, "query_find", _value(string_value=query))],
+    )
+
+
+# Interaction répétée sur chaque page : (appelle l'API, fonction(session, itération))
+PAGE_ACTIONS = {
+    "Home": (False, lambda session, i: session.interact(triggers=[("Apply", None)])),
+    "IUDC": (True, lambda session, i: session.interact(triggers=[("Insert", None)])),
+    "Countries and their area": (False, lambda session, i: session.interact(
+        values=[("number_input", "Number of countries to display", None, _value(double_value=10 + i % 20))],
+    )),
+    "Map of the population in 2000, 2010 and 2023": (False, lambda session, i: session.interact(triggers=[("Show Maps", None)])),
+    "Specific Requests": (True, lambda session, i: session.interact(triggers=[("Shearch The Most Populated Country", None)])),
+    "Personalized Requests": (True, _find),
+    "What-if Projections": (False, lambda session, i: session.interact(
+        values=[("slider", "Target year", None, _value(double_array_value=[2030 + i % 70]))],
+    )),
+}
+
+
+def wait_until_loaded(port: int, timeout: float):
+    # Le premier chargement se fait en arrière-plan : on attend que les données soient servies
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with Session(port, "Home", timeout) as session:
+            session.start()
+            if not session.loading():
+                return True
+        time.sleep(0.5)
+    return False
+
+
+def run_session(port, pages, iterations, timeout, barrier, result):
+    """
+    Simule une session : ouvre chaque page et y répète son interaction `iterations` fois en mesurant
+    chaque exécution. Toutes les sessions démarrent ensemble.
+
+    Parameters:
+    - port (int): Le port du serveur Streamlit.
+    - pages (list): Les pages à parcourir.
+    - iterations (int): Le nombre d'interactions par page.
+    - timeout (float): Le délai maximal d'une exécution.
+    - barrier (Barrier): La barrière de départ partagée avec le thread principal.
+    - result (dict): Rempli avec {"latencies": list, "errors": list, "runs": int}.
+    """
+    latencies, errors, runs = [], [], 0
+    result.update(latencies=latencies, errors=errors, runs=0)
+    barrier.wait()
+    for page in pages:
+        _, action = PAGE_ACTIONS.get(page, (False, lambda session, i: session.run()))
+        try:
+            with Session(port, page, timeout) as session:
+                ok, page_errors = session.start()
+                if not ok:
+                    errors.append(f"{page}: {page_errors[0] if page_errors else 'page did not load'}")
+                    continue
+                for i in range(iterations):
+                    runs += 1
+                    start = time.perf_counter()
+                    try:
+                        ok, run_errors = action(session, i)
+                    except Exception as e:
+                        errors.append(f"{page}: {type(e).__name__}: {e}")
+                        continue
+                    elapsed = time.perf_counter() - start
+                    if not ok:
+                        errors.append(f"{page}: {run_errors[0] if run_errors else 'script did not complete'}")
+                        continue
+                    latencies.append(elapsed)
+        except Exception as e:
+            errors.append(f"{page}: {type(e).__name__}: {e}")
+    result["runs"] = runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge du dashboard Streamlit.")
+    parser.add_argument("--sessions", type=int, default=10, help="Nombre de sessions simultanées sur le même serveur")
+    parser.add_argument("--iterations", type=int, default=3, help="Nombre d'interactions par page et par session")
+    parser.add_argument("--pages", nargs="*", default=None, help="Pages à parcourir (toutes par défaut)")
+    parser.add_argument("--countries", type=int, default=250, help="Nombre de pays servis par l'API locale")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latence (s) ajoutée par l'API locale")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Délai maximal (s) d'une exécution")
+    args = parser.parse_args()
+
+    api = StandInApi(args.countries, args.latency).start()
+    pages = args.pages or list(PAGE_ACTIONS)
+    port = free_port()
+    server = start_server(api.url, port, args.timeout)
+    try:
+        if not wait_until_loaded(port, args.timeout):
+            raise SystemExit("The dashboard did not load its data in time.")
+        rss_idle = rss_bytes(server.pid)
+
+        # La mémoire du serveur est relevée pendant tout le test
+        rss_peak = rss_idle
+        done = threading.Event()
+
+        def sample():
+            nonlocal rss_peak
+            while not done.wait(0.1):
+                rss_peak = max(rss_peak, rss_bytes(server.pid))
+
+        sampler = threading.Thread(target=sample, name="rss-sampler", daemon=True)
+        sampler.start()
+
+        # Les appels à l'API ne sont comptés qu'une fois toutes les sessions prêtes à démarrer
+        barrier = threading.Barrier(args.sessions + 1)
+        results = [{} for _ in range(args.sessions)]
+        threads = [
+            threading.Thread(target=run_session, args=(port, pages, args.iterations, args.timeout, barrier, result))
+            for result in results
+        ]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        calls_start = api.calls
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        calls = api.calls - calls_start
+        done.set()
+        sampler.join()
+        rss_end = rss_bytes(server.pid)
+    finally:
+        server.terminate()
+        server.wait()
+        api.stop()
+
+    latencies = [latency for result in results for latency in result["latencies"]]
+    errors = [error for result in results for error in result["errors"]]
+    runs = sum(result["runs"] for result in results)
+    print(f"Sessions: {args.sessions}  Pages: {len(pages)}  Runs: {runs}  Completed: {len(latencies)}  Failed: {runs - len(latencies)}")
+    if latencies:
+        print(
+            f"Run latency (ms): p50={percentile(latencies, 50) * 1000:.1f}  p95={percentile(latencies, 95) * 1000:.1f}  "
+            f"p99={percentile(latencies, 99) * 1000:.1f}  mean={statistics.mean(latencies) * 1000:.1f}"
+        )
+        print(f"Throughput: {len(latencies) / elapsed:.1f} runs/s")
+    if runs:
+        print(f"API calls per run: {calls / runs:.2f}")
+    if rss_idle:
+        print(
+            f"Server RSS: idle={rss_idle / 2**20:.1f} MiB  peak={rss_peak / 2**20:.1f} MiB  end={rss_end / 2**20:.1f} MiB  "
+            f"growth per session={(rss_end - rss_idle) / args.sessions / 2**20:+.1f} MiB"
+        )
+    for error in errors[:10]:
+        print(f"  {error}")
+
+
+if __name__ == "__main__":
+    main()
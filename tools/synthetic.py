@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from utils.interpolation import POPULATION_YEARS
+
+
+def synthetic_countries(n: int, seed: int = 0):
+    """
+    Génère un jeu de données fictif ayant la forme du modèle Country (plus la colonne _id).
+
+    Parameters:
+    - n (int): Le nombre de pays à générer.
+    - seed (int): La graine du générateur aléatoire, pour des données reproductibles.
+
+    Returns:
+    DataFrame: Un objet DataFrame avec une ligne par pays.
+    """
+    rng = np.random.default_rng(seed)
+    pop2023 = rng.lognormal(15, 2, n).astype(np.int64) + 1000
+    growth = rng.normal(0.01, 0.01, n)
+    area = rng.lognormal(11, 2.5, n).round() + 1
+    df = pd.DataFrame({
+        "_id": [f"{i:024x}" for i in range(n)],
+        "country": [f"Country {i}" for i in range(n)],
+        "rank": np.arange(1, n + 1),
+        "area": area,
+        "landAreaKm": (area * rng.uniform(0.8, 1.0, n)).round(),
+        "cca2": [f"{chr(65 + i // 26 % 26)}{chr(65 + i % 26)}" for i in range(n)],
+        "cca3": [f"{chr(65 + i // 676 % 26)}{chr(65 + i // 26 % 26)}{chr(65 + i % 26)}" for i in range(n)],
+        "netChange": rng.uniform(-0.1, 0.5, n).round(4),
+        "growthRate": growth.round(4),
+        "worldPercentage": (pop2023 / pop2023.sum()).round(6),
+        "density": (pop2023 / area).round(2),
+        "densityMi": (pop2023 / area * 2.59).round(2),
+        "place": rng.integers(1, 1000, n),
+    })
+    for year in POPULATION_YEARS:
+        df[f"pop{year}"] = (pop2023 * (1 + growth) ** (year - 2023)).astype(np.int64)
+    return df
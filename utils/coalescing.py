@@ -0,0 +1,169 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Regroupe les appels identiques simultanés : un seul appel est réellement exécuté et son
+    résultat est partagé avec tous les appelants qui attendaient la même clé.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """
+        Exécute `fn` une seule fois pour tous les appels simultanés portant la même clé.
+
+        Parameters:
+        - key: La clé identifiant l'appel (par exemple l'URL de la requête).
+        - fn (callable): La fonction à exécuter.
+
+        Returns:
+        Le résultat de `fn` (l'exception levée par `fn` est relancée chez chaque appelant).
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+
+class Hedger:
+    """
+    Requêtes couvertes (hedging) : si un appel dépasse le percentile `percentile` des latences
+    observées pour son endpoint, un second appel identique est envoyé et la première réponse
+    obtenue est gardée.
+    """
+
+    def __init__(self, enabled: bool = True, percentile: float = 95, min_samples: int = 20, window: int = 200, max_workers: int = 16):
+        """
+        Parameters:
+        - enabled (bool): Active ou désactive l'envoi des seconds appels.
+        - percentile (float): Le percentile de latence au-delà duquel on envoie le second appel.
+        - min_samples (int): Le nombre de latences à observer avant de commencer à couvrir un endpoint.
+        - window (int): Le nombre de latences récentes conservées par endpoint.
+        - max_workers (int): Le nombre maximal d'appels exécutés en parallèle.
+        """
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="api-hedge")
+        self._metrics = {"calls": 0, "hedges_fired": 0, "hedges_won": 0}
+
+    def threshold(self, endpoint: str):
+        """
+        Renvoie la latence (en secondes) au-delà de laquelle un appel à l'endpoint est couvert.
+
+        Returns:
+        float: Le seuil, ou None si trop peu de latences ont été observées.
+        """
+        with self._lock:
+            samples = sorted(self._latencies.get(endpoint, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * self.percentile / 100))]
+
+    def call(self, endpoint: str, fn):
+        """
+        Exécute `fn` en envoyant si besoin un second appel identique.
+
+        Parameters:
+        - endpoint (str): Le nom de l'endpoint (les latences sont suivies par endpoint).
+        - fn (callable): La fonction qui envoie la requête.
+
+        Returns:
+        Le résultat du premier appel réussi.
+        """
+        with self._lock:
+            self._metrics["calls"] += 1
+        threshold = self.threshold(endpoint) if self.enabled else None
+        if threshold is None:
+            start = time.monotonic()
+            result = fn()
+            self._record(endpoint, time.monotonic() - start)
+            return result
+
+        # Le délai court à partir du moment où le premier appel s'exécute : l'attente d'un
+        # thread libre n'est pas une lenteur de l'API et ne doit pas déclencher de second appel
+        started = threading.Event()
+
+        def first_call():
+            nonlocal start
+            start = time.monotonic()
+            started.set()
+            return fn()
+
+        start = None
+        first = self._executor.submit(first_call)
+        started.wait()
+        done, _ = wait([first], timeout=max(0.0, threshold - (time.monotonic() - start)))
+        if done:
+            result = first.result()
+            self._record(endpoint, time.monotonic() - start)
+            return result
+
+        # Le premier appel est trop lent : on envoie le second et on garde la première réponse
+        with self._lock:
+            self._metrics["hedges_fired"] += 1
+        second = self._executor.submit(fn)
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                if future is second:
+                    with self._lock:
+                        self._metrics["hedges_won"] += 1
+                self._record(endpoint, time.monotonic() - start)
+                return future.result()
+        raise error
+
+    def metrics(self):
+        """
+        Renvoie les compteurs : nombre d'appels, de seconds appels envoyés et de seconds appels gagnants.
+
+        Returns:
+        dict: Un dictionnaire {"calls": int, "hedges_fired": int, "hedges_won": int}.
+        """
+        with self._lock:
+            return dict(self._metrics)
+
+    def _record(self, endpoint, latency):
+        with self._lock:
+            self._latencies.setdefault(endpoint, deque(maxlen=self.window)).append(latency)
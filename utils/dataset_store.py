@@ -0,0 +1,156 @@
+import threading
+
+import pandas as pd
+
+
+# Copy-on-write : les vues renvoyées aux sessions partagent la mémoire du jeu de données
+# et ne le copient qu'au moment d'une modification (par défaut à partir de pandas 3).
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+class DatasetStore:
+    """
+    Stockage partagé par tout le processus Streamlit des jeux de données en lecture seule.
+
+    Chaque jeu de données est conservé en un seul exemplaire, associé à un numéro de version
+    incrémenté à chaque publication. Les sessions reçoivent des vues sans copie ; grâce au
+    copy-on-write, toute dérivation faite par une session produit sa propre copie sans
+    jamais modifier l'exemplaire partagé.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._datasets = {}
+
+    def publish(self, name: str, df: pd.DataFrame, expected_version: int = None):
+        """
+        Publie une nouvelle version d'un jeu de données et remplace l'ancienne de façon atomique.
+
+        Parameters:
+        - name (str): Le nom du jeu de données.
+        - df (DataFrame): Les nouvelles données.
+        - expected_version (int): Si fourni, la publication n'a lieu que si la version courante est
+          toujours celle-ci (0 pour un jeu de données pas encore chargé).
+
+        Returns:
+        int: Le numéro de la version publiée, ou 0 si une autre version a été publiée entre-temps.
+        """
+        with self._lock:
+            entry = self._datasets.get(name)
+            if expected_version is not None and (entry["version"] if entry is not None else 0) != expected_version:
+                return 0
+            return self._publish(name, df)
+
+    def apply(self, name: str, fn):
+        """
+        Applique une modification à la version courante d'un jeu de données et publie le résultat.
+
+        La lecture et la publication se font sous le même verrou : aucune autre publication ne
+        peut s'intercaler et être perdue.
+
+        Parameters:
+        - name (str): Le nom du jeu de données.
+        - fn (callable): La fonction qui reçoit la version courante et renvoie la nouvelle.
+
+        Returns:
+        int: Le numéro de la version publiée, ou 0 si le jeu de données n'a pas encore été chargé.
+        """
+        with self._lock:
+            entry = self._datasets.get(name)
+            if entry is None:
+                return 0
+            return self._publish(name, fn(entry["df"].copy(deep=False)))
+
+    def _publish(self, name, df):
+        # On garde notre propre référence : l'appelant ne peut plus modifier l'exemplaire partagé
+        df = df.copy(deep=False)
+        nbytes = int(df.memory_usage(index=True, deep=True).sum())
+        version = self._datasets[name]["version"] + 1 if name in self._datasets else 1
+        self._datasets[name] = {"version": version, "df": df, "bytes": nbytes}
+        return version
+
+    def snapshot(self, name: str):
+        """
+        Renvoie ensemble le numéro de version et la vue de la version courante d'un jeu de données.
+
+        Les deux sont lus sous le même verrou : la version désigne toujours exactement les données
+        renvoyées, même si une publication a lieu entre-temps.
+
+        Parameters:
+        - name (str): Le nom du jeu de données.
+
+        Returns:
+        tuple: (version, DataFrame), ou (0, None) si le jeu de données n'a pas encore été chargé.
+        """
+        with self._lock:
+            entry = self._datasets.get(name)
+        if entry is None:
+            return 0, None
+        return entry["version"], entry["df"].copy(deep=False)
+
+    def version(self, name: str):
+        """
+        Renvoie le numéro de la version courante d'un jeu de données (0 s'il n'a pas été chargé).
+        """
+        with self._lock:
+            entry = self._datasets.get(name)
+        return entry["version"] if entry is not None else 0
+
+    def memory_usage(self):
+        """
+        Renvoie la mémoire occupée par chaque jeu de données et sa version.
+
+        Returns:
+        dict: Un dictionnaire {nom: {"version": int, "bytes": int}}.
+        """
+        with self._lock:
+            return {
+                name: {"version": entry["version"], "bytes": entry["bytes"]}
+                for name, entry in self._datasets.items()
+            }
+
+
+def upsert_row(df: pd.DataFrame, key_col: str, key, values: dict):
+    """
+    Renvoie une copie du DataFrame où la ligne identifiée par `key` est mise à jour, ou ajoutée si elle n'existe pas.
+
+    Parameters:
+    - df (DataFrame): Le jeu de données.
+    - key_col (str): La colonne identifiant les lignes (par exemple _id).
+    - key: La valeur identifiant la ligne (None pour ajouter une nouvelle ligne).
+    - values (dict): Les nouvelles valeurs ; les colonnes absentes du jeu de données sont ignorées.
+
+    Returns:
+    DataFrame: Le nouveau jeu de données.
+    """
+    values = {col: value for col, value in values.items() if col in df.columns}
+    mask = df[key_col] == key if key is not None and key_col in df.columns else None
+    if mask is not None and mask.any():
+        df = df.copy(deep=False)
+        df.loc[mask, list(values)] = list(values.values())
+        return df
+
+    row = dict(values)
+    if key_col in df.columns and key_col not in row:
+        row[key_col] = key
+    # Nouvel index à la suite des existants (l'index peut avoir des trous après une suppression)
+    label = df.index.max() + 1 if len(df) and pd.api.types.is_integer_dtype(df.index) else len(df)
+    return pd.concat([df, pd.DataFrame([row], index=[label])])
+
+
+def delete_row(df: pd.DataFrame, key_col: str, key):
+    """
+    Renvoie une copie du DataFrame sans la ligne identifiée par `key`.
+
+    Parameters:
+    - df (DataFrame): Le jeu de données.
+    - key_col (str): La colonne identifiant les lignes (par exemple _id).
+    - key: La valeur identifiant la ligne à supprimer.
+
+    Returns:
+    DataFrame: Le nouveau jeu de données.
+    """
+    if key_col not in df.columns:
+        return df
+    return df[df[key_col] != key]
@@ -0,0 +1,69 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from utils.interpolation import POPULATION_YEARS
+
+
+class DerivedMetrics:
+    """
+    Colonnes calculées une seule fois par version du jeu de données : rang par année, croissance
+    entre chaque paire d'années, part du total mondial et centiles de superficie et de densité.
+
+    L'ordre de tri de chaque colonne utile est aussi précalculé, si bien qu'un top N n'est plus
+    qu'une tranche de k lignes.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Parameters:
+        - df (DataFrame): Le jeu de données des pays.
+        """
+        years = [year for year in POPULATION_YEARS if f"pop{year}" in df.columns]
+        pops = {year: df[f"pop{year}"].astype(float) for year in years}
+
+        columns = {"country": df["country"]}
+        for year, pop in pops.items():
+            columns[f"rank_pop{year}"] = pop.rank(ascending=False, method="min")
+            columns[f"share_pop{year}"] = pop / pop.sum()
+        for start, end in combinations(years, 2):
+            columns[f"growth_{start}_{end}"] = pops[end] - pops[start]
+            columns[f"growth_pct_{start}_{end}"] = (pops[end] / pops[start].replace(0, np.nan) - 1) * 100
+        for col in ("area", "density"):
+            if col in df.columns:
+                columns[f"{col}_percentile"] = df[col].rank(pct=True) * 100
+
+        # Toutes les colonnes sont assemblées en une seule fois
+        self.frame = pd.DataFrame(columns, index=df.index)
+
+        # Positions des lignes triées par ordre décroissant (valeurs manquantes à la fin)
+        self._order = {}
+        for col in [f"pop{year}" for year in years] + [c for c in ("area", "density") if c in df.columns]:
+            values = df[col].to_numpy(dtype=float)
+            self._order[col] = np.argsort(np.where(np.isnan(values), np.inf, -values), kind="stable")
+
+    def top_n(self, col: str, n: int, within=None):
+        """
+        Renvoie les index des n pays ayant les plus grandes valeurs d'une colonne.
+
+        Parameters:
+        - col (str): La colonne de tri (pop{année}, area ou density).
+        - n (int): Le nombre de pays.
+        - within: Les index auxquels se limiter (tous les pays par défaut).
+
+        Returns:
+        Index: Les index des pays, du plus grand au plus petit.
+        """
+        order = self._order[col]
+        if within is not None:
+            # On garde l'ordre précalculé, restreint aux lignes demandées
+            # Les index absents de ce jeu de données sont ignorés (get_indexer renvoie alors -1)
+            positions = self.frame.index.get_indexer(within)
+            keep = np.zeros(len(self.frame), dtype=bool)
+            keep[positions[positions >= 0]] = True
+            order = order[keep[order]]
+        return self.frame.index[order[:n]]
+
+    def nbytes(self):
+        return int(self.frame.memory_usage(index=True, deep=True).sum()) + sum(order.nbytes for order in self._order.values())
@@ -0,0 +1,176 @@
+import io
+
+import pandas as pd
+import streamlit as st
+
+
+# Formats d'export proposés : extension et type MIME
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "NDJSON": ("ndjson", "application/x-ndjson"),
+}
+
+# Taille maximale (en octets) d'un fichier exporté : Streamlit sert les téléchargements depuis la
+# mémoire, le fichier y est donc construit en entier et l'export est refusé au-delà de cette taille
+EXPORT_MAX_BYTES = 100 * 2**20
+
+
+class ExportError(Exception):
+    """
+    L'export ne peut pas être servi complet (page en erreur ou taille maximale dépassée).
+    """
+
+
+def iter_chunks(source, chunk_size: int = 10_000):
+    """
+    Parcourt les données morceau par morceau, sans jamais les copier en entier.
+
+    Parameters:
+    - source (DataFrame | callable): Un DataFrame déjà en cache (découpé en vues), ou une fonction
+      fetch_page(offset, limit) qui récupère une page de résultats (DataFrame vide à la fin, None en cas d'erreur).
+    - chunk_size (int): Le nombre de lignes par morceau.
+
+    Returns:
+    generator: Les morceaux successifs (DataFrame).
+
+    Raises:
+    ExportError: Si une page n'a pas pu être récupérée.
+    """
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunk_size):
+            yield source.iloc[start:start + chunk_size]
+        return
+
+    offset = 0
+    while True:
+        page = source(offset, chunk_size)
+        # Seule une page vide marque la fin : une erreur ne doit pas produire un fichier incomplet
+        if page is None:
+            raise ExportError(f"La page commençant à la ligne {offset} n'a pas pu être récupérée.")
+        if page.empty:
+            return
+        yield page
+        if len(page) < chunk_size:
+            return
+        offset += len(page)
+
+
+def aligned_chunks(chunks, columns=None):
+    """
+    Aligne chaque morceau sur les mêmes colonnes : les pages d'une requête peuvent renvoyer les
+    champs dans un autre ordre, ou sans certains champs (valeurs manquantes).
+
+    Parameters:
+    - chunks (iterable): Les morceaux (DataFrame).
+    - columns (Index): Les colonnes du fichier, par exemple l'union de celles des pages déjà chargées
+      (celles du premier morceau par défaut).
+
+    Raises:
+    ValueError: Si un morceau contient une colonne inconnue (l'en-tête est déjà écrit).
+    """
+    for chunk in chunks:
+        if columns is None:
+            columns = chunk.columns
+        else:
+            extra = chunk.columns.difference(columns)
+            if len(extra):
+                raise ValueError(f"Colonnes absentes de l'en-tête de l'export : {list(extra)}")
+        if not chunk.columns.equals(columns):
+            chunk = chunk.reindex(columns=columns)
+        yield chunk
+
+
+def write_export(source, fmt: str, file, chunk_size: int = 10_000, max_bytes: int = None, columns=None):
+    """
+    Écrit les données dans un fichier au format demandé, morceau par morceau.
+
+    Parameters:
+    - source (DataFrame | callable): Les données (voir iter_chunks).
+    - fmt (str): Le format d'export ("CSV", "Parquet" ou "NDJSON").
+    - file: Le fichier binaire dans lequel écrire.
+    - chunk_size (int): Le nombre de lignes par morceau.
+    - max_bytes (int): Si fourni, l'export est refusé dès que le fichier dépasse cette taille.
+    - columns (Index): Les colonnes du fichier CSV ou Parquet (voir aligned_chunks).
+
+    Returns:
+    int: Le nombre de lignes écrites.
+
+    Raises:
+    ExportError: Si une page n'a pas pu être récupérée ou si le fichier dépasse max_bytes.
+    """
+    rows = 0
+    start = file.tell()
+    if fmt == "Parquet":
+        # pyarrow n'est nécessaire que pour l'export Parquet
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for chunk in aligned_chunks(iter_chunks(source, chunk_size), columns):
+                table = pa.Table.from_pandas(chunk, preserve_index=False, schema=writer.schema if writer else None)
+                if writer is None:
+                    writer = pq.ParquetWriter(file, table.schema)
+                writer.write_table(table)
+                rows += len(chunk)
+                check_size(file.tell() - start, max_bytes)
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+
+    # Le NDJSON décrit chaque ligne complètement : seul le CSV dépend des colonnes du premier morceau
+    chunks = iter_chunks(source, chunk_size)
+    for i, chunk in enumerate(aligned_chunks(chunks, columns) if fmt == "CSV" else chunks):
+        if fmt == "CSV":
+            text = chunk.to_csv(index=False, header=(i == 0))
+        elif fmt == "NDJSON":
+            text = chunk.to_json(orient="records", lines=True, force_ascii=False)
+            # Selon la version de pandas, la dernière ligne se termine déjà par un saut de ligne
+            text = text if text.endswith("\n") else text + "\n"
+        else:
+            raise ValueError(f"Format d'export inconnu : {fmt}")
+        file.write(text.encode("utf-8"))
+        rows += len(chunk)
+        check_size(file.tell() - start, max_bytes)
+    return rows
+
+
+def check_size(size: int, max_bytes: int = None):
+    # Un fichier tronqué paraîtrait complet : on refuse de le servir plutôt que de le couper
+    if max_bytes is not None and size > max_bytes:
+        raise ExportError(f"L'export dépasse {max_bytes // 2**20} Mio : affinez la requête ou le filtre.")
+
+
+def export_button(source, key: str, file_name: str, columns=None):
+    """
+    Affiche le choix du format et le bouton de téléchargement des données.
+
+    Le fichier n'est généré qu'au clic, morceau par morceau. Streamlit garde le fichier servi en
+    mémoire : sa taille est donc limitée à EXPORT_MAX_BYTES, au-delà le téléchargement échoue
+    plutôt que de servir un fichier incomplet.
+
+    Parameters:
+    - source (DataFrame | callable): Les données à exporter (voir iter_chunks).
+    - key (str): Un identifiant unique, utilisé pour les clés des widgets.
+    - file_name (str): Le nom du fichier téléchargé, sans extension.
+    - columns (Index): Les colonnes du fichier (voir aligned_chunks).
+    """
+    fmt = st.selectbox("Export format", list(EXPORT_FORMATS), key=f"{key}_export_format")
+    extension, mime = EXPORT_FORMATS[fmt]
+
+    def generate():
+        file = io.BytesIO()
+        write_export(source, fmt, file, max_bytes=EXPORT_MAX_BYTES, columns=columns)
+        return file.getvalue()
+
+    st.download_button(
+        f"⬇️ Download {fmt}",
+        data=generate,
+        file_name=f"{file_name}.{extension}",
+        mime=mime,
+        key=f"{key}_export",
+        on_click="ignore",
+    )
+    st.caption(f"Exports are limited to {EXPORT_MAX_BYTES // 2**20} MiB; larger results cannot be downloaded, narrow the query first.")
@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+
+
+# Années pour lesquelles le modèle Country contient une population (colonnes pop{année})
+POPULATION_YEARS = (1980, 2000, 2010, 2022, 2023, 2030, 2050)
+
+
+def _linear(known_years, values, years):
+    # Segment [known_years[i], known_years[i + 1]] contenant chaque année, commun à tous les pays
+    idx = np.clip(np.searchsorted(known_years, years, side="right") - 1, 0, len(known_years) - 2)
+    w = (years - known_years[idx]) / (known_years[idx + 1] - known_years[idx])
+    return values[:, idx] * (1 - w) + values[:, idx + 1] * w
+
+
+def _pchip_slopes(h, delta):
+    # Pentes de Fritsch-Carlson (interpolation de Hermite monotone), calculées pour tous les pays à la fois
+    n, k = delta.shape[0], delta.shape[1] + 1
+    d = np.zeros((n, k))
+    if k == 2:
+        d[:, 0] = d[:, 1] = delta[:, 0]
+        return d
+
+    w1 = 2 * h[1:] + h[:-1]
+    w2 = h[1:] + 2 * h[:-1]
+    same_sign = delta[:, :-1] * delta[:, 1:] > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        harmonic = (w1 + w2) / (w1 / delta[:, :-1] + w2 / delta[:, 1:])
+    d[:, 1:-1] = np.where(same_sign, harmonic, 0.0)
+
+    # Extrémités : formule à trois points, bornée pour préserver la monotonie
+    for end, (h0, h1, d0, d1) in ((0, (h[0], h[1], delta[:, 0], delta[:, 1])), (-1, (h[-1], h[-2], delta[:, -1], delta[:, -2]))):
+        slope = ((2 * h0 + h1) * d0 - h0 * d1) / (h0 + h1)
+        slope = np.where(np.sign(slope) != np.sign(d0), 0.0, slope)
+        slope = np.where((np.sign(d0) != np.sign(d1)) & (np.abs(slope) > 3 * np.abs(d0)), 3 * d0, slope)
+        d[:, end] = slope
+    return d
+
+
+def _pchip(known_years, values, years):
+    h = np.diff(known_years).astype(float)
+    delta = np.diff(values, axis=1) / h
+    d = _pchip_slopes(h, delta)
+
+    idx = np.clip(np.searchsorted(known_years, years, side="right") - 1, 0, len(known_years) - 2)
+    hi = h[idx]
+    t = (years - known_years[idx]) / hi
+    h00 = 2 * t**3 - 3 * t**2 + 1
+    h10 = t**3 - 2 * t**2 + t
+    h01 = -2 * t**3 + 3 * t**2
+    h11 = t**3 - t**2
+    return h00 * values[:, idx] + h10 * hi * d[:, idx] + h01 * values[:, idx + 1] + h11 * hi * d[:, idx + 1]
+
+
+class PopulationInterpolator:
+    """
+    Matrice dense de la population de chaque pays pour chaque année, calculée en une seule
+    passe vectorisée à partir des colonnes pop{année} du jeu de données.
+    """
+
+    METHODS = {"linear": _linear, "monotone": _pchip}
+
+    def __init__(self, df: pd.DataFrame, method: str = "linear"):
+        """
+        Parameters:
+        - df (DataFrame): Le jeu de données des pays (colonnes country et pop{année}).
+        - method (str): "linear" pour une interpolation linéaire, "monotone" pour une spline monotone (PCHIP).
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Méthode d'interpolation inconnue : {method}")
+        known = [year for year in POPULATION_YEARS if f"pop{year}" in df.columns]
+        if len(known) < 2:
+            raise ValueError("Au moins deux colonnes de population sont nécessaires.")
+
+        self.method = method
+        self.index = df.index
+        self.countries = df["country"].to_numpy()
+        self.known_years = np.array(known)
+        self.years = np.arange(known[0], known[-1] + 1)
+        values = df[[f"pop{year}" for year in known]].to_numpy(dtype=float)
+        self.matrix = self.METHODS[method](self.known_years, values, self.years)
+
+    def at(self, year: int):
+        """
+        Renvoie la population de chaque pays pour une année.
+
+        Parameters:
+        - year (int): L'année souhaitée (entre la première et la dernière année connue).
+
+        Returns:
+        Series: La population de chaque pays, indexée comme le jeu de données.
+        """
+        return pd.Series(self.matrix[:, self._column(year)], index=self.index, name=f"pop{year}")
+
+    def between(self, start: int, end: int):
+        """
+        Renvoie la population de chaque pays pour chaque année d'un intervalle (bornes incluses).
+
+        Parameters:
+        - start (int): La première année.
+        - end (int): La dernière année.
+
+        Returns:
+        DataFrame: Une ligne par pays (indexée comme le jeu de données) et une colonne par année.
+        """
+        cols = slice(self._column(start), self._column(end) + 1)
+        return pd.DataFrame(self.matrix[:, cols], index=self.index, columns=self.years[cols])
+
+    def trend(self, index=None, start: int = None, end: int = None):
+        """
+        Renvoie les populations au format long (country, Year, Population) pour les graphiques.
+
+        Parameters:
+        - index: Les index des pays à garder (tous les pays par défaut).
+        - start (int): La première année (la première année connue par défaut).
+        - end (int): La dernière année (la dernière année connue par défaut).
+
+        Returns:
+        DataFrame: Un objet DataFrame avec les colonnes country, Year et Population.
+        """
+        start = self.years[0] if start is None else start
+        end = self.years[-1] if end is None else end
+        cols = slice(self._column(start), self._column(end) + 1)
+        rows = np.arange(len(self.index)) if index is None else self.index.get_indexer(index)
+        # Les index absents de ce jeu de données sont ignorés (get_indexer renvoie alors -1)
+        rows = rows[rows >= 0]
+        block = self.matrix[rows, cols]
+        years = self.years[cols]
+        return pd.DataFrame({
+            "country": np.repeat(self.countries[rows], len(years)),
+            "Year": np.tile(years, len(rows)),
+            "Population": block.ravel(),
+        })
+
+    def _column(self, year):
+        if not self.years[0] <= year <= self.years[-1]:
+            raise ValueError(f"L'année doit être comprise entre {self.years[0]} et {self.years[-1]}.")
+        return int(year - self.years[0])
@@ -0,0 +1,159 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+# Attributs des traces Plotly qui portent les données d'un graphique
+_FIGURE_DATA_ATTRS = ("x", "y", "z", "locations", "text", "hovertext", "customdata", "ids")
+
+
+def frame_bytes(df: pd.DataFrame):
+    """
+    Renvoie la mémoire occupée par un DataFrame (chaînes de caractères comprises).
+    """
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def figure_bytes(fig):
+    """
+    Renvoie une estimation de la mémoire occupée par les données d'un graphique Plotly.
+    """
+    total = 0
+    for trace in fig.data:
+        for attr in _FIGURE_DATA_ATTRS:
+            value = getattr(trace, attr, None) if attr in trace else None
+            if value is not None:
+                array = np.asarray(value)
+                total += array.nbytes if array.dtype != object else sum(len(str(v)) for v in array.ravel())
+    return total
+
+
+class CacheMemory:
+    """
+    Mémoire occupée par les caches partagés du processus (une entrée par clé de cache).
+
+    Une entrée peut être liée à l'objet mis en cache : elle disparaît quand celui-ci est libéré,
+    par exemple quand st.cache_resource l'évince pour faire place à une nouvelle version.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._caches = {}
+
+    def record(self, cache: str, key, nbytes: int, owner=None):
+        """
+        Enregistre la mémoire occupée par une entrée de cache.
+
+        Parameters:
+        - cache (str): Le nom du cache.
+        - key: La clé de l'entrée dans le cache.
+        - nbytes (int): La mémoire occupée (en octets).
+        - owner: L'objet mis en cache ; l'entrée est oubliée quand il est libéré.
+        """
+        token = object()
+        with self._lock:
+            self._caches.setdefault(cache, {})[key] = (int(nbytes), token)
+        if owner is not None:
+            weakref.finalize(owner, self._release, cache, key, token)
+
+    def _release(self, cache, key, token):
+        with self._lock:
+            entries = self._caches.get(cache, {})
+            # Une entrée enregistrée depuis sous la même clé n'est pas concernée
+            if key in entries and entries[key][1] is token:
+                del entries[key]
+
+    def forget(self, cache: str):
+        with self._lock:
+            self._caches.pop(cache, None)
+
+    def by_cache(self):
+        """
+        Renvoie la mémoire occupée par chaque cache.
+
+        Returns:
+        dict: Un dictionnaire {cache: octets}.
+        """
+        with self._lock:
+            return {cache: sum(nbytes for nbytes, _ in entries.values()) for cache, entries in self._caches.items()}
+
+    def total(self):
+        return sum(self.by_cache().values())
+
+
+class SessionMemory:
+    """
+    Mémoire occupée par une session : résultats gardés dans st.session_state et graphiques affichés.
+
+    Les résultats sont soumis à un budget : au-delà, les plus anciens sont libérés puis le
+    nouveau résultat est tronqué pour tenir dans ce qui reste.
+    """
+
+    def __init__(self, budget: int):
+        """
+        Parameters:
+        - budget (int): La mémoire maximale (en octets) des résultats gardés par la session.
+        """
+        self.budget = budget
+        self.results = OrderedDict()
+        self.linked = {}
+        self.figures = {}
+
+    def results_bytes(self):
+        return sum(self.results.values())
+
+    def figures_bytes(self):
+        return sum(self.figures.values())
+
+    def store(self, name: str, df: pd.DataFrame, linked=()):
+        """
+        Garde un résultat dans st.session_state en respectant le budget de la session.
+
+        Parameters:
+        - name (str): La clé du résultat dans st.session_state.
+        - df (DataFrame): Le résultat à garder.
+        - linked (tuple): Les autres clés de st.session_state qui dépendent du résultat (par exemple
+          son pager) et doivent être libérées avec lui.
+
+        Returns:
+        DataFrame: Le résultat gardé, éventuellement tronqué.
+        """
+        self.results.pop(name, None)
+        self.linked[name] = tuple(linked)
+        nbytes = frame_bytes(df)
+
+        # On libère les résultats les plus anciens tant que le nouveau ne tient pas
+        while self.results and self.results_bytes() + nbytes > self.budget:
+            evicted, _ = self.results.popitem(last=False)
+            for key in (evicted,) + self.linked.pop(evicted, ()):
+                st.session_state.pop(key, None)
+
+        available = self.budget - self.results_bytes()
+        if nbytes > available and len(df):
+            rows = max(0, int(available / (nbytes / len(df))))
+            st.warning(f"The result has been truncated to {rows:,} of {len(df):,} rows to stay within the session memory budget.")
+            # Copie des lignes gardées : une simple vue retiendrait toute la mémoire du résultat
+            df = df.iloc[:rows].copy()
+            nbytes = frame_bytes(df)
+
+        self.results[name] = nbytes
+        st.session_state[name] = df
+        return df
+
+    def track_figure(self, name: str, fig):
+        self.figures[name] = figure_bytes(fig)
+
+
+def session_memory(budget: int):
+    """
+    Renvoie la comptabilité mémoire de la session courante (créée au premier appel).
+    """
+    if "session_memory" not in st.session_state:
+        st.session_state.session_memory = SessionMemory(budget)
+    memory = st.session_state.session_memory
+    memory.budget = budget
+    return memory
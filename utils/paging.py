@@ -0,0 +1,175 @@
+import json
+import threading
+
+import pandas as pd
+
+
+def find_to_pipeline(query: str):
+    """
+    Convertit une requête find (filtre JSON, ou liste [filtre, projection]) en pipeline d'agrégation.
+
+    Parameters:
+    - query (str): La requête find saisie par l'utilisateur.
+
+    Returns:
+    list: Le pipeline équivalent, ou None si la requête n'est pas du JSON reconnu.
+    """
+    try:
+        parsed = json.loads(query) if query.strip() else {}
+    except ValueError:
+        return None
+    if isinstance(parsed, dict):
+        return [{"$match": parsed}]
+    if isinstance(parsed, list) and 1 <= len(parsed) <= 2 and all(isinstance(p, dict) for p in parsed):
+        return [{"$match": parsed[0]}] + ([{"$project": parsed[1]}] if len(parsed) == 2 else [])
+    return None
+
+
+def aggregation_to_pipeline(query: str):
+    """
+    Lit une requête d'agrégation (liste JSON d'étapes).
+
+    Returns:
+    list: Le pipeline, ou None si la requête n'est pas une liste JSON d'étapes.
+    """
+    try:
+        parsed = json.loads(query)
+    except ValueError:
+        return None
+    if isinstance(parsed, dict):
+        parsed = [parsed]
+    if isinstance(parsed, list) and all(isinstance(stage, dict) for stage in parsed):
+        return parsed
+    return None
+
+
+def stable_order(pipeline: list):
+    """
+    Ajoute un tri sur _id à la fin du pipeline si son ordre de sortie n'est pas garanti (aucun $sort,
+    ou un $group après le dernier $sort) : chaque page étant une exécution distincte du pipeline,
+    $skip et $limit ne découpent le résultat sans doublon ni trou que si l'ordre est stable.
+
+    Returns:
+    list: Le pipeline, trié si besoin.
+    """
+    stages = [next(iter(stage), None) for stage in pipeline]
+    last_sort = max((i for i, name in enumerate(stages) if name == "$sort"), default=-1)
+    last_group = max((i for i, name in enumerate(stages) if name == "$group"), default=-1)
+    if last_sort == -1 or last_group > last_sort:
+        return pipeline + [{"$sort": {"_id": 1}}]
+    return pipeline
+
+
+class QueryPager:
+    """
+    Exécution page par page d'un pipeline d'agrégation : $skip et $limit sont ajoutés au pipeline
+    (trié au besoin pour que l'ordre soit le même d'une page à l'autre), seule la première page est chargée, les suivantes à la demande (la prochaine étant préchargée
+    en arrière-plan).
+    """
+
+    def __init__(self, pipeline: list, fetch, page_size: int = 100, executor=None):
+        """
+        Parameters:
+        - pipeline (list): Le pipeline d'agrégation de l'utilisateur.
+        - fetch (callable): La fonction qui exécute un pipeline et renvoie un DataFrame (ou None en cas d'erreur).
+        - page_size (int): Le nombre de documents par page.
+        - executor (Executor): L'exécuteur utilisé pour précharger la page suivante (pas de préchargement par défaut).
+        """
+        self.pipeline = pipeline
+        self.fetch = fetch
+        self.page_size = page_size
+        self.executor = executor
+        self.offset = 0
+        self.pages = []
+        self.exhausted = False
+        self.truncated = False
+        self.total = None
+        self._lock = threading.Lock()
+        self._prefetched = None
+
+    def fetch_page(self, offset: int, limit: int):
+        """
+        Exécute le pipeline pour `limit` documents à partir de la position `offset`.
+
+        Returns:
+        DataFrame: La page récupérée, ou None en cas d'erreur.
+        """
+        return self.fetch(stable_order(self.pipeline) + [{"$skip": offset}, {"$limit": limit}])
+
+    def next_page(self):
+        """
+        Charge la page suivante (préchargée si possible) et avance la position.
+
+        Returns:
+        DataFrame: La page chargée (vide s'il n'y a plus de résultats), ou None en cas d'erreur.
+        """
+        with self._lock:
+            if self.exhausted:
+                return pd.DataFrame()
+            offset = self.offset
+            prefetched, self._prefetched = self._prefetched, None
+
+        if prefetched is not None and prefetched[0] == offset:
+            page = prefetched[1].result()
+        else:
+            page = self.fetch_page(offset, self.page_size)
+        if page is None:
+            return None
+
+        with self._lock:
+            self.pages.append(page)
+            self.offset = offset + len(page)
+            self.exhausted = len(page) < self.page_size
+            if self.exhausted and self.total is None:
+                self.total = offset + len(page)
+        self.prefetch()
+        return page
+
+    def prefetch(self):
+        """
+        Lance en arrière-plan le chargement de la page suivante.
+        """
+        with self._lock:
+            if self.executor is None or self.exhausted or self._prefetched is not None:
+                return
+            self._prefetched = (self.offset, self.executor.submit(self.fetch_page, self.offset, self.page_size))
+
+    def count(self):
+        """
+        Compte le nombre total de documents du résultat avec une étape $count.
+
+        Returns:
+        int: Le nombre total de documents, ou None si le comptage a échoué.
+        """
+        df = self.fetch(self.pipeline + [{"$count": "total"}])
+        if df is not None:
+            self.total = int(df["total"].iloc[0]) if "total" in df.columns and len(df) else 0
+        return self.total
+
+    def loaded(self):
+        return sum(len(page) for page in self.pages)
+
+    def truncate(self, df: pd.DataFrame):
+        """
+        Remplace les pages chargées par `df` (leurs premières lignes, par exemple tronquées pour tenir
+        dans un budget mémoire) et arrête le chargement des pages suivantes.
+        """
+        with self._lock:
+            if self._prefetched is not None:
+                self._prefetched[1].cancel()
+            self._prefetched = None
+            self.pages = [df]
+            self.exhausted = True
+            self.truncated = True
+
+    def frame(self):
+        """
+        Renvoie toutes les pages chargées en un seul DataFrame.
+        """
+        with self._lock:
+            if not self.pages:
+                return pd.DataFrame()
+            # On ne garde que le DataFrame assemblé, pour ne pas conserver les données en double
+            if len(self.pages) > 1:
+                self.pages = [pd.concat(self.pages, ignore_index=True)]
+            return self.pages[0]
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+
+class ProjectionEngine:
+    """
+    Projection de la population de tous les pays pour une année cible, à partir de la population
+    de l'année de base et du taux de croissance annuel (growthRate) de chaque pays.
+
+    Le calcul est vectorisé pour tous les pays ; modifier le taux d'un seul pays ne recalcule que
+    sa ligne et met à jour le total mondial par différence.
+    """
+
+    def __init__(self, df: pd.DataFrame, base_year: int = 2023):
+        """
+        Parameters:
+        - df (DataFrame): Le jeu de données des pays (colonnes country, growthRate et pop{base_year}).
+        - base_year (int): L'année de la population de départ.
+        """
+        self.base_year = base_year
+        self.index = df.index
+        self.countries = df["country"].to_numpy()
+        self.base = df[f"pop{base_year}"].to_numpy(dtype=float)
+        self.base_rates = np.nan_to_num(df["growthRate"].to_numpy(dtype=float))
+        self.rates = self.base_rates.copy()
+        # Identifiants stables des pays, pour reprendre les ajustements sur une autre version des données
+        self.keys = df["_id"].to_numpy() if "_id" in df.columns else self.countries
+        self.delta = 0.0
+        self.overrides = {}
+        self.target_year = base_year
+        self.projected = self.base.copy()
+        self.total = float(np.nansum(self.projected))
+
+    def copy(self):
+        """
+        Renvoie une copie indépendante (par exemple pour une session), qui partage la population de base.
+        """
+        engine = object.__new__(ProjectionEngine)
+        engine.__dict__.update(self.__dict__)
+        engine.rates = self.rates.copy()
+        engine.projected = self.projected.copy()
+        engine.overrides = dict(self.overrides)
+        return engine
+
+    def adopt(self, other):
+        """
+        Reprend l'ajustement global, les taux modifiés pays par pays et l'année cible d'une autre
+        projection, par exemple celle d'une version précédente du jeu de données. Les pays qui
+        n'existent plus sont ignorés.
+
+        Parameters:
+        - other (ProjectionEngine): La projection dont on reprend les ajustements.
+        """
+        self.delta = other.delta
+        self.rates = self.base_rates + other.delta
+        self.overrides = {}
+        for i in np.flatnonzero(np.isin(self.keys, list(other.overrides))):
+            key = self.keys[i]
+            self.rates[i] = self.overrides[key] = other.overrides[key]
+        return self.project(other.target_year)
+
+    def project(self, target_year: int):
+        """
+        Recalcule la projection de tous les pays pour une année cible (calcul vectorisé).
+
+        Parameters:
+        - target_year (int): L'année de la projection.
+
+        Returns:
+        Series: La population projetée de chaque pays, indexée comme le jeu de données.
+        """
+        self.target_year = target_year
+        self.projected = self.base * (1 + self.rates) ** (target_year - self.base_year)
+        self.total = float(np.nansum(self.projected))
+        return self.series()
+
+    def set_rate(self, label, rate: float):
+        """
+        Modifie le taux de croissance d'un pays et ne met à jour que sa projection et le total.
+
+        Parameters:
+        - label: L'index du pays dans le jeu de données.
+        - rate (float): Le nouveau taux de croissance annuel (0.01 pour 1 %).
+        """
+        i = self.index.get_loc(label)
+        old = self.projected[i]
+        self.rates[i] = self.overrides[self.keys[i]] = rate
+        self.projected[i] = self.base[i] * (1 + rate) ** (self.target_year - self.base_year)
+        self.total += np.nan_to_num(self.projected[i]) - np.nan_to_num(old)
+
+    def shift_rates(self, delta: float):
+        """
+        Ajoute `delta` au taux de croissance d'origine de tous les pays, puis recalcule la projection.
+        """
+        self.delta = delta
+        self.overrides = {}
+        self.rates = self.base_rates + delta
+        return self.project(self.target_year)
+
+    def reset(self):
+        """
+        Revient aux taux de croissance d'origine.
+        """
+        return self.shift_rates(0.0)
+
+    def series(self):
+        return pd.Series(self.projected, index=self.index, name=f"pop{self.target_year}")
+
+    def frame(self):
+        """
+        Renvoie, pour chaque pays, le taux utilisé, la population de base, la population projetée et sa part du total.
+
+        Returns:
+        DataFrame: Un objet DataFrame indexé comme le jeu de données.
+        """
+        return pd.DataFrame({
+            "country": self.countries,
+            "growthRate": self.rates,
+            f"pop{self.base_year}": self.base,
+            f"projected{self.target_year}": self.projected,
+            "worldPercentage": self.projected / self.total if self.total else 0.0,
+        }, index=self.index)
@@ -0,0 +1,102 @@
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+
+class BackgroundRefresher:
+    """
+    Rafraîchit les jeux de données en arrière-plan (stale-while-revalidate).
+
+    Les sessions lisent toujours la version courante du DatasetStore sans attendre ; un thread
+    recharge périodiquement chaque jeu de données et publie la nouvelle version de façon
+    atomique. Si un rafraîchissement échoue, l'ancienne version reste servie ; si les données
+    n'ont pas changé, aucune version n'est publiée et les caches qui en dépendent restent valides.
+    """
+
+    def __init__(self, store, loaders: dict, interval: float = 600.0, retry_interval: float = 30.0):
+        """
+        Parameters:
+        - store (DatasetStore): Le stockage dans lequel publier les données.
+        - loaders (dict): Un dictionnaire {nom du jeu de données: fonction de chargement}.
+        - interval (float): Le délai en secondes entre deux rafraîchissements réussis.
+        - retry_interval (float): Le délai en secondes avant de réessayer après un échec.
+        """
+        self.store = store
+        self.loaders = loaders
+        self.interval = interval
+        self.retry_interval = retry_interval
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._status = {name: {"last_updated": None, "last_error": None} for name in loaders}
+        # Version publiée par le dernier rafraîchissement et empreinte de son contenu
+        self._published = {}
+
+    def start(self):
+        """
+        Démarre le thread de rafraîchissement (une seule fois).
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="dataset-refresher", daemon=True)
+                self._thread.start()
+        return self
+
+    def refresh_now(self):
+        """
+        Demande un rafraîchissement immédiat sans attendre son résultat.
+        """
+        self._wakeup.set()
+
+    def refresh(self, name: str):
+        """
+        Recharge un jeu de données et publie la nouvelle version si le chargement a réussi et
+        que son contenu diffère de la version courante.
+
+        Parameters:
+        - name (str): Le nom du jeu de données.
+
+        Returns:
+        bool: True si le chargement a réussi (nouvelle version publiée ou données inchangées), False
+        s'il a échoué ou s'il a été devancé par une écriture.
+        """
+        # Version au début du chargement : une écriture publiée pendant celui-ci ne doit pas être écrasée
+        version = self.store.version(name)
+        try:
+            df = self.loaders[name]()
+        except Exception as e:
+            print(f"Erreur lors du rafraîchissement de {name} : {e}")
+            df = None
+        with self._lock:
+            if df is None:
+                self._status[name]["last_error"] = datetime.now()
+                return False
+            digest = int(pd.util.hash_pandas_object(df, index=True).sum())
+            # Contenu identique à la version courante (aucune écriture depuis) : rien à publier
+            if self._published.get(name) != (version, digest):
+                published = self.store.publish(name, df, expected_version=version)
+                if not published:
+                    # Une écriture a été publiée pendant le chargement, qui l'a peut-être précédée :
+                    # on garde l'écriture et on recharge un peu plus tard
+                    return False
+                self._published[name] = (published, digest)
+            self._status[name] = {"last_updated": datetime.now(), "last_error": None}
+            return True
+
+    def status(self, name: str):
+        """
+        Renvoie l'état du dernier rafraîchissement d'un jeu de données.
+
+        Returns:
+        dict: Un dictionnaire {"last_updated": datetime | None, "last_error": datetime | None}.
+        """
+        with self._lock:
+            return dict(self._status[name])
+
+    def _run(self):
+        while True:
+            ok = all([self.refresh(name) for name in self.loaders])
+            # On attend le prochain rafraîchissement (plus tôt en cas d'échec ou de demande explicite)
+            self._wakeup.wait(self.interval if ok else self.retry_interval)
+            self._wakeup.clear()
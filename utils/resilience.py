@@ -0,0 +1,166 @@
+import threading
+import time
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur pour un endpoint de l'API.
+
+    Après `failure_threshold` échecs consécutifs le disjoncteur s'ouvre et les appels sont
+    refusés immédiatement pendant `reset_timeout` secondes ; un seul appel d'essai est ensuite
+    autorisé (état semi-ouvert) pour savoir si l'endpoint répond de nouveau.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow_request(self):
+        """
+        Indique si un appel peut être envoyé à l'endpoint.
+
+        Returns:
+        bool: True si l'appel est autorisé, False si le disjoncteur est ouvert.
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                # Un seul appel d'essai à la fois
+                self._state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class ApiHealth:
+    """
+    État de santé de l'API : préchauffage au démarrage et un disjoncteur par endpoint.
+
+    Seuls le préchauffage et les disjoncteurs des endpoints essentiels (`core_endpoints`) décident
+    de l'état global : une panne sur un autre endpoint ne bloque que cet endpoint.
+    """
+
+    WARMING = "warming"
+    UP = "up"
+    DOWN = "down"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0, core_endpoints=()):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.core_endpoints = frozenset(core_endpoints)
+        self._lock = threading.Lock()
+        self._breakers = {}
+        self._warmup = self.WARMING
+
+    def breaker(self, endpoint: str):
+        """
+        Renvoie le disjoncteur associé à un endpoint (créé au premier appel).
+
+        Parameters:
+        - endpoint (str): Le nom de l'endpoint.
+
+        Returns:
+        CircuitBreaker: Le disjoncteur de l'endpoint.
+        """
+        with self._lock:
+            if endpoint not in self._breakers:
+                self._breakers[endpoint] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self._breakers[endpoint]
+
+    def warm_up(self, ping):
+        """
+        Réveille l'API en arrière-plan sans bloquer le démarrage de l'application.
+
+        Parameters:
+        - ping (callable): La fonction qui envoie la requête de préchauffage (renvoie True si l'API répond).
+        """
+        def run():
+            try:
+                ok = ping()
+            except Exception as e:
+                print(f"Erreur lors du préchauffage de l'API : {e}")
+                ok = False
+            with self._lock:
+                self._warmup = self.UP if ok else self.DOWN
+
+        threading.Thread(target=run, name="api-warmup", daemon=True).start()
+        return self
+
+    def mark_up(self):
+        with self._lock:
+            self._warmup = self.UP
+
+    def state(self):
+        """
+        Renvoie l'état global de l'API.
+
+        Returns:
+        str: "warming" pendant le préchauffage, "down" si le préchauffage a échoué ou si le
+        disjoncteur d'un endpoint essentiel est ouvert, "up" sinon.
+        """
+        with self._lock:
+            warmup = self._warmup
+            breakers = [b for endpoint, b in self._breakers.items() if endpoint in self.core_endpoints]
+        if warmup == self.WARMING:
+            return self.WARMING
+        if warmup == self.DOWN or any(b.state == CircuitBreaker.OPEN for b in breakers):
+            return self.DOWN
+        return self.UP
+
+    def is_degraded(self):
+        """
+        Indique si l'application doit passer en mode dégradé (lecture seule des dernières données connues).
+        """
+        return self.state() == self.DOWN
+
+    def is_available(self, endpoint: str):
+        """
+        Indique si un endpoint accepte des appels (son disjoncteur n'est pas ouvert).
+
+        Parameters:
+        - endpoint (str): Le nom de l'endpoint.
+
+        Returns:
+        bool: False si le disjoncteur de l'endpoint est ouvert, True sinon.
+        """
+        with self._lock:
+            breaker = self._breakers.get(endpoint)
+        return breaker is None or breaker.state != CircuitBreaker.OPEN
+
+    def breaker_states(self):
+        """
+        Renvoie l'état du disjoncteur de chaque endpoint déjà appelé.
+
+        Returns:
+        dict: Un dictionnaire {endpoint: état}.
+        """
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {endpoint: breaker.state for endpoint, breaker in breakers.items()}
@@ -0,0 +1,136 @@
+import unicodedata
+from collections import defaultdict
+
+import pandas as pd
+
+
+def normalize(text: str):
+    """
+    Met un texte sous une forme comparable : minuscules, sans accents ni espaces superflus.
+    """
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.lower().split())
+
+
+def _ngrams(text: str, n: int = 3):
+    padded = f"  {text} "
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def levenshtein(a: str, b: str):
+    """
+    Renvoie la distance d'édition (insertions, suppressions, substitutions) entre deux textes.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+class CountryIndex:
+    """
+    Index de recherche en mémoire sur les noms de pays et leurs codes cca2 et cca3.
+
+    Un arbre de préfixes sert l'autocomplétion ; les n-grammes et la distance d'édition
+    permettent de retrouver un pays malgré une faute de frappe ou une différence de casse.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Parameters:
+        - df (DataFrame): Le jeu de données des pays (colonnes country, cca2 et cca3).
+        """
+        self.index = df.index
+        self.countries = df["country"].tolist()
+        self._keys = []
+        self._exact = {}
+        self._trie = {}
+        self._grams = defaultdict(set)
+        for position, row in enumerate(df[["country", "cca2", "cca3"]].itertuples(index=False)):
+            for value in row:
+                if isinstance(value, str) and value.strip():
+                    self._add(normalize(value), position)
+
+    def _add(self, key, position):
+        key_id = len(self._keys)
+        self._keys.append((key, position))
+        self._exact.setdefault(key, position)
+        node = self._trie
+        for char in key:
+            node = node.setdefault(char, {})
+            node.setdefault("$", []).append(key_id)
+        for gram in _ngrams(key):
+            self._grams[gram].add(key_id)
+
+    def _ranked(self, text):
+        # Renvoie les positions des pays triées par pertinence, avec leur score
+        text = normalize(text)
+        if not text:
+            return []
+        scores = {}
+
+        # Correspondances par préfixe (le trie stocke à chaque nœud les clés qui passent par lui)
+        node = self._trie
+        for char in text:
+            node = node.get(char)
+            if node is None:
+                break
+        else:
+            for key_id in node.get("$", []):
+                key, position = self._keys[key_id]
+                score = 0 if key == text else 1 + (len(key) - len(text)) / 100
+                scores[position] = min(scores.get(position, score), score)
+
+        # Correspondances approchées : candidats partageant des n-grammes, classés par distance d'édition
+        # (pas pour les textes très courts, comme les codes, où une lettre change tout, ni quand
+        # le texte est exactement un nom ou un code connu)
+        if len(text) < 4 or text in self._exact:
+            return sorted(scores.items(), key=lambda item: (item[1], self.countries[item[0]]))
+        counts = defaultdict(int)
+        for gram in _ngrams(text):
+            for key_id in self._grams.get(gram, ()):
+                counts[key_id] += 1
+        for key_id, _ in sorted(counts.items(), key=lambda item: -item[1])[:50]:
+            key, position = self._keys[key_id]
+            distance = levenshtein(text, key)
+            if distance <= max(1, len(text) // 3):
+                score = 2 + distance
+                scores[position] = min(scores.get(position, score), score)
+
+        return sorted(scores.items(), key=lambda item: (item[1], self.countries[item[0]]))
+
+    def suggest(self, text: str, limit: int = 10):
+        """
+        Renvoie les noms de pays correspondant à un texte saisi, du plus au moins pertinent.
+
+        Parameters:
+        - text (str): Le texte saisi (nom, début de nom, cca2 ou cca3, éventuellement avec une faute).
+        - limit (int): Le nombre maximal de suggestions.
+
+        Returns:
+        list: Les noms de pays suggérés.
+        """
+        return [self.countries[position] for position, _ in self._ranked(text)[:limit]]
+
+    def resolve(self, text: str):
+        """
+        Renvoie l'index (dans le jeu de données) du pays le plus proche d'un texte saisi.
+
+        Parameters:
+        - text (str): Le texte saisi.
+
+        Returns:
+        L'index du pays trouvé, ou None si aucun pays ne correspond.
+        """
+        # Nom ou code exact : une simple recherche dans le dictionnaire suffit
+        position = self._exact.get(normalize(text))
+        if position is not None:
+            return self.index[position]
+        ranked = self._ranked(text)
+        return self.index[ranked[0][0]] if ranked else None
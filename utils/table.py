@@ -0,0 +1,77 @@
+import math
+import weakref
+
+import pandas as pd
+import streamlit as st
+
+
+def _sort_positions(column: pd.Series, ascending: bool):
+    # On ne trie que la colonne demandée et on garde les positions des lignes
+    column = column.reset_index(drop=True)
+    try:
+        ordered = column.sort_values(ascending=ascending, na_position="last", kind="stable")
+    except TypeError:
+        # Colonne aux types mélangés (résultats de requêtes personnalisées) : tri sur le texte
+        ordered = column.astype(str).sort_values(ascending=ascending, kind="stable")
+    return ordered.index.to_numpy()
+
+
+def _cached_positions(df: pd.DataFrame, key: str, sort_by, ascending: bool, version=None):
+    # L'ordre de tri est gardé dans la session : changer de page ne relance pas le tri
+    token = (version if version is not None else id(df), sort_by, ascending, len(df))
+    cached = st.session_state.get(f"{key}_sorted")
+    # Sans version, l'identifiant n'est valable que tant que le même DataFrame est vivant
+    if cached is not None and cached[0] == token and (version is not None or cached[1]() is df):
+        return cached[2]
+    positions = _sort_positions(df[sort_by], ascending)
+    st.session_state[f"{key}_sorted"] = (token, weakref.ref(df), positions)
+    return positions
+
+
+def paged_dataframe(df: pd.DataFrame, key: str, columns=None, page_sizes=(25, 50, 100, 250), version=None):
+    """
+    Affiche un DataFrame page par page : seule la page visible est envoyée au navigateur.
+
+    Le tri et le découpage sont faits côté serveur, et la sélection de colonnes est appliquée
+    avant la sérialisation, si bien que le temps d'affichage ne dépend pas de la taille du résultat :
+    l'ordre de tri n'est calculé qu'une fois par jeu de données, colonne et sens.
+
+    Parameters:
+    - df (DataFrame): Les données à afficher.
+    - key (str): Un identifiant unique du tableau, utilisé pour les clés des widgets.
+    - columns (list): Les colonnes à afficher (toutes par défaut).
+    - page_sizes (tuple): Les tailles de page proposées.
+    - version: Un identifiant du contenu de df, pour les DataFrame reconstruits à chaque exécution
+      (l'ordre de tri est gardé tant qu'il ne change pas). Par défaut, l'ordre de tri est gardé tant
+      que df est le même objet.
+
+    Returns:
+    DataFrame: La page affichée.
+    """
+    source = df
+    if columns is not None:
+        df = df[list(columns)]
+    total = len(df)
+
+    sort_col, order_col, size_col, page_col = st.columns([3, 2, 2, 2])
+    sort_by = sort_col.selectbox("Sort by", [None] + list(df.columns), format_func=lambda c: "—" if c is None else str(c), key=f"{key}_sort")
+    ascending = order_col.selectbox("Order", ["Ascending", "Descending"], key=f"{key}_order") == "Ascending"
+    page_size = size_col.selectbox("Rows per page", page_sizes, key=f"{key}_size")
+
+    n_pages = max(1, math.ceil(total / page_size))
+    # La page mémorisée peut dépasser le nombre de pages après un changement de taille ou de données
+    if st.session_state.get(f"{key}_page", 1) > n_pages:
+        st.session_state[f"{key}_page"] = n_pages
+    page = page_col.number_input("Page", min_value=1, max_value=n_pages, step=1, key=f"{key}_page")
+
+    start = (page - 1) * page_size
+    end = min(start + page_size, total)
+    if sort_by is None:
+        window = df.iloc[start:end]
+    else:
+        # Les colonnes affichées ne changent pas l'ordre des lignes : le tri porte sur le DataFrame d'origine
+        window = df.iloc[_cached_positions(source, key, sort_by, ascending, version)[start:end]]
+
+    st.dataframe(window, use_container_width=True)
+    st.caption(f"Rows {start + 1 if total else 0}–{end} of {total:,}")
+    return window